@@ -0,0 +1,86 @@
+import os
+import queue
+import threading
+import time
+import checkpoint
+import recorder
+
+
+class Autosaver:
+    """Simulation observer that checkpoints the run every every_turns turns or every_seconds seconds,
+    whichever comes first (0 disables either). At the turn boundary it only copies the state,
+    a background thread writes the copy while the simulation keeps going.
+    Each session writes into its own run_<timestamp> subdirectory of directory as autosave_<turn>.npz,
+    so sessions never overwrite or prune each other's saves. The newest keep autosaves of the session
+    are kept, keep <= 0 keeps every one."""
+    def __init__(self, directory, every_turns=0, every_seconds=0, keep=3):
+        self._directory = directory
+        self._session_directory = None  # created by the first write
+        self._every_turns = every_turns
+        self._every_seconds = every_seconds
+        self._keep = keep
+        self._last_turn = None
+        self._last_time = time.monotonic()
+        self._errors = []  # messages of failed writes
+
+        # one pending snapshot at most, a slow disk skips autosaves instead of piling up copies
+        self._pending = queue.Queue(maxsize=1)
+        self._writer = threading.Thread(target=self.__write_loop, daemon=True)
+        self._writer.start()
+
+    def __call__(self, simulation):
+        turn = simulation.get_stats().get_general_stats()["turn"]
+        if self._last_turn is None:
+            self._last_turn = turn  # count from the first turn seen, e.g. of a loaded save
+        turns_due = self._every_turns > 0 and turn - self._last_turn >= self._every_turns
+        time_due = self._every_seconds > 0 and time.monotonic() - self._last_time >= self._every_seconds
+        if (turns_due or time_due) and not self._pending.full():
+            self._pending.put((turn, checkpoint.snapshot(simulation.get_organisms(), simulation.get_stats())))
+            self._last_turn = turn
+            self._last_time = time.monotonic()
+
+    def pop_errors(self):
+        """Return and forget the error messages of failed writes since the last call"""
+        errors = self._errors
+        self._errors = []
+        return errors
+
+    def list_saves(self):
+        """Return the paths of the autosaves of this session, oldest first"""
+        if self._session_directory is None or not os.path.isdir(self._session_directory):
+            return []
+        saves = []
+        for name in os.listdir(self._session_directory):
+            if name.startswith("autosave_") and name.endswith(checkpoint.extension):
+                turn = name[len("autosave_"):-len(checkpoint.extension)]
+                if turn.isdigit():
+                    saves.append((int(turn), os.path.join(self._session_directory, name)))
+        return [path for turn, path in sorted(saves)]
+
+    def get_session_directory(self):
+        """Return the directory of this session's autosaves, None before the first write"""
+        return self._session_directory
+
+    def close(self):
+        """Finish the pending write and stop the writer thread"""
+        self._pending.put(None)
+        self._writer.join()
+
+    def __write_loop(self):
+        """Writer thread, writes snapshots until close() sends None"""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            turn, arrays = item
+            try:
+                if self._session_directory is None:
+                    self._session_directory = recorder.create_run_directory(self._directory)
+                checkpoint.write(os.path.join(self._session_directory,
+                                              "autosave_" + str(turn) + checkpoint.extension), arrays)
+                # drop the oldest autosaves of this session beyond keep
+                if self._keep > 0:
+                    for path in self.list_saves()[:-self._keep]:
+                        os.remove(path)
+            except OSError as error:
+                self._errors.append("Autosave failed.\n\n" + str(error))
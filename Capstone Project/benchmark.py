@@ -0,0 +1,132 @@
+import argparse
+import concurrent.futures
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import settings
+import profiler
+import simulation
+
+try:
+    import resource  # peak RSS, not available on Windows
+except ImportError:
+    resource = None
+
+# the four turn phases timed separately by the simulation profiler
+phases = ("set_target", "move", "battle", "conclude_turn")
+
+
+def split_population(total, ratio):
+    """Return (prey, predators) counts of a starting population of total organisms
+    with ratio predators per prey"""
+    predators = int(round(total * ratio / (1 + ratio)))
+    return total - predators, predators
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in bytes, or None where it is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(job):
+    """Benchmark one (population, ratio) case. Executed in a fresh worker process so peak RSS is per case.
+    Returns the result dict of the case"""
+    total, ratio, seed, turns, warmup, alloc_turns = job
+    prey, predators = split_population(total, ratio)
+    prey_attributes = dict(settings.prey_attributes, population=prey)
+    pred_attributes = dict(settings.pred_attributes, population=predators)
+
+    start = time.perf_counter()
+    engine = simulation.Simulation(prey_attributes, pred_attributes, seed=seed)
+    setup_seconds = time.perf_counter() - start
+    engine.step(warmup)
+
+    # timing pass, the profiler window covers every timed turn
+    profile = engine.get_profiler()
+    profile.reset(max(turns, 1))
+    start = time.perf_counter()
+    engine.step(turns)
+    elapsed = time.perf_counter() - start
+    profile.next_turn()  # close the last timed turn
+    summary = profile.get_summary()
+    final_population = len(engine.get_organisms())
+
+    # allocation pass, separate since tracing slows every allocation down
+    tracemalloc.start()
+    allocated = []
+    for turn in range(alloc_turns):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        engine.step()
+        current, peak = tracemalloc.get_traced_memory()
+        allocated.append((peak - before, current - before))
+    tracemalloc.stop()
+
+    phase_seconds = {phase: summary[phase]["mean"] for phase in phases}
+    phase_seconds["other"] = max(elapsed / max(turns, 1) - sum(phase_seconds.values()), 0.0)
+    return {"population": total,
+            "ratio": ratio,
+            "prey": prey,
+            "predators": predators,
+            "seed": seed,
+            "turns": turns,
+            "final_population": final_population,
+            "setup_seconds": setup_seconds,
+            "turns_per_sec": turns / elapsed if elapsed > 0 else None,
+            "seconds_per_turn": elapsed / max(turns, 1),
+            "phase_seconds_per_turn": phase_seconds,
+            "counts_per_turn": {name: summary[name]["mean"] for name in profiler.counters},
+            "peak_rss_bytes": peak_rss(),
+            "alloc_peak_bytes_per_turn": float(np.mean([a[0] for a in allocated])) if allocated else None,
+            "alloc_net_bytes_per_turn": float(np.mean([a[1] for a in allocated])) if allocated else None}
+
+
+def run_benchmark(populations=(100, 1000, 10000, 100000), ratios=(0.05, 0.25), seed=0, turns=20, warmup=2,
+                  alloc_turns=3, output=None, log=print):
+    """Run every (population, ratio) case in its own process, one at a time so cases do not compete for cores.
+    Returns the report dict and writes it as JSON to output if given"""
+    cases = []
+    for total in populations:
+        for ratio in ratios:
+            job = (total, ratio, seed, turns, warmup, alloc_turns)
+            # a fresh process per case keeps peak RSS from carrying over
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_case, job).result()
+            cases.append(result)
+            if log is not None:
+                log(str(total) + " organisms, ratio " + str(ratio) + ": " +
+                    str(round(result["turns_per_sec"] or 0, 2)) + " turns/sec")
+
+    report = {"python": platform.python_version(),
+              "numpy": np.__version__,
+              "machine": platform.machine(),
+              "system": platform.system(),
+              "cases": cases}
+    if output is not None:
+        with open(output, "w") as json_file:
+            json.dump(report, json_file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the A-Life turn pipeline headlessly.")
+    parser.add_argument("--populations", type=lambda text: [int(v) for v in text.split(",")],
+                        default=[100, 1000, 10000, 100000], help="comma separated starting populations")
+    parser.add_argument("--ratios", type=lambda text: [float(v) for v in text.split(",")],
+                        default=[0.05, 0.25], help="comma separated predators per prey")
+    parser.add_argument("--seed", type=int, default=0, help="seed of every case")
+    parser.add_argument("--turns", type=int, default=20, help="timed turns per case")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed turns before timing")
+    parser.add_argument("--alloc-turns", type=int, default=3, help="turns traced for allocations")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON report")
+    args = parser.parse_args()
+
+    run_benchmark(args.populations, args.ratios, args.seed, args.turns, args.warmup, args.alloc_turns, args.output)
+    print("Wrote " + args.output + ".")
@@ -0,0 +1,86 @@
+import json
+import os
+import numpy as np
+import lineage
+import population
+import statistics
+import time_series
+
+# version of the checkpoint layout, bumped whenever it changes incompatibly
+format_version = 2
+extension = ".npz"
+
+
+def save(file_name, organisms, session_stats):
+    """Write a checkpoint of the population store and the session statistics between turns.
+    The file is an uncompressed .npz archive holding one array per state field,
+    plus the statistics as JSON, their per-turn series as a record array and one array per
+    lineage field, so it does not depend on the layout of any class"""
+    write(file_name, snapshot(organisms, session_stats))
+
+
+def snapshot(organisms, session_stats):
+    """Return the arrays of a checkpoint of the current state, to be written by write() while the
+    simulation keeps changing. Only state held in memory is copied: the population columns and the
+    newest per-turn records. Spilled records are left on disk as a RingBuffer.snapshot() and lineage
+    fields written once at birth are shared, see Lineage.snapshot(), so the cost does not grow with
+    the length of the run"""
+    arrays = {"version": np.array(format_version),
+              "next_uid": np.array(organisms.get_next_uid()),
+              "statistics": np.array(json.dumps(session_stats.get_state())),
+              "series": session_stats.get_series().snapshot()}
+    for name in tuple(population.scalar_fields) + population.vector_fields:
+        arrays["column_" + name] = organisms.column(name).copy()
+    for name, array in session_stats.get_lineage().snapshot().items():
+        arrays["lineage_" + name] = array
+    return arrays
+
+
+def write(file_name, arrays):
+    """Write checkpoint arrays to file_name atomically: a crash leaves either the old file or the new one.
+    The series snapshot of snapshot() is read back from disk here"""
+    arrays = dict(arrays, series=time_series.read_snapshot(arrays["series"]))
+    temporary = file_name + ".tmp"
+    # a file object keeps numpy from appending .npz to names with other extensions
+    with open(temporary, "wb") as checkpoint_file:
+        np.savez(checkpoint_file, **arrays)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary, file_name)
+
+
+def load(file_name):
+    """Read a checkpoint written by save(). Returns [organisms, session_stats], the save data of Simulation.
+    Raises ValueError for files that are not checkpoints or were written by a newer version"""
+    with np.load(file_name, allow_pickle=False) as archive:
+        if "version" not in archive.files:
+            raise ValueError("not a simulation checkpoint")
+        version = int(archive["version"])
+        if version > format_version:
+            raise ValueError("checkpoint format version " + str(version) + " is newer than this program")
+
+        columns = {}
+        lineage_columns = {}
+        for name in archive.files:
+            if name.startswith("column_"):
+                columns[name[len("column_"):]] = archive[name]
+            elif name.startswith("lineage_"):
+                lineage_columns[name[len("lineage_"):]] = archive[name]
+        if "uid" not in columns:
+            raise ValueError("checkpoint holds no population")
+        state = json.loads(str(archive["statistics"]))
+        next_uid = int(archive["next_uid"])
+        series = archive["series"] if "series" in archive.files else None  # version 1 had no series
+
+    organisms = population.Population(max(population.initial_capacity, len(columns["uid"])))
+    organisms.restore(columns, next_uid)
+    session_stats = statistics.Statistics(state["pred_init"], state["prey_init"], state["general"].get("seed"))
+    session_stats.set_state(state, series)
+    if lineage_columns:
+        session_stats.get_lineage().restore(lineage_columns)
+    else:
+        # checkpoints without lineage: the living organisms become founders of unknown birth
+        session_stats.get_lineage().record_births(columns["uid"], -1, -1, columns["identifier"],
+                                                  columns["generation"],
+                                                  {name: columns[name] for name in lineage.trait_fields})
+    return [organisms, session_stats]
@@ -0,0 +1,255 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import settings
+import population
+import random_streams
+import simulation
+import simulation_steps
+import spatial_grid
+
+
+class SharedPopulation(population.Population):
+    """Population whose columns live in multiprocessing.shared_memory blocks,
+    so worker processes read and write them in place without copying.
+    Growing the store replaces the blocks, get_layout() describes the current ones."""
+    def __init__(self, source=None, capacity=population.initial_capacity):
+        self._blocks = {}  # column name -> SharedMemory
+        self._retired = []  # blocks of columns replaced while growing
+        self._version = 0  # incremented whenever the blocks change
+        if source is not None:
+            capacity = max(capacity, source.get_capacity())
+        super().__init__(capacity)
+
+        # take over the rows of an existing store
+        if source is not None:
+            self.copy_from(source)
+
+    def _allocate(self, name, shape, dtype):
+        """Place the column in a new shared memory block"""
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        if name in self._blocks:
+            self._retired.append(self._blocks[name])
+        self._blocks[name] = block
+        self._version += 1
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[:] = 0
+        return array
+
+    def _released(self):
+        """Free the blocks of the columns replaced while growing"""
+        for block in self._retired:
+            block.close()
+            block.unlink()
+        self._retired = []
+
+    def get_layout(self):
+        """Return (version, {column name: (block name, shape, dtype)}) for attaching from another process"""
+        layout = {}
+        for name, array in self._columns.items():
+            layout[name] = (self._blocks[name].name, array.shape, array.dtype.str)
+        return self._version, layout
+
+    def close(self):
+        """Free every shared memory block. The store is unusable afterwards"""
+        self._columns = {}
+        for block in list(self._blocks.values()) + self._retired:
+            block.close()
+            block.unlink()
+        self._blocks = {}
+        self._retired = []
+
+
+class LocalRows:
+    """Gathered copy of a subset of population rows, kept in ascending row order.
+    Offers the column() interface of Population, so the batched steps run on it unchanged,
+    and scatter() writes chosen columns of chosen local rows back to the shared store."""
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = rows
+        self._gathered = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def column(self, name):
+        if name not in self._gathered:
+            self._gathered[name] = self._columns[name][self._rows]
+        return self._gathered[name]
+
+    def scatter(self, names, local_rows):
+        for name in names:
+            self._columns[name][self._rows[local_rows]] = self._gathered[name][local_rows]
+
+
+def tile_of(streams, tiles, positions):
+    """Return the tile index of each position. Tiles are vertical strips made of whole random stream regions,
+    so every region is stepped by exactly one worker and draws stay identical for any worker count"""
+    return streams.region_of(positions) // (streams.get_regions() // tiles)
+
+
+def tile_rows(columns, size, streams, tile, tiles, reach):
+    """Return (rows, owned) for one tile: the ascending rows of every organism owned by the tile or within reach
+    of it (the ghost region), and a boolean mask over those rows marking the owned ones"""
+    position = columns["position"][:size]
+    owner = tile_of(streams, tiles, position)
+    width = settings.screen_size / tiles
+    low = -np.inf if tile == 0 else -settings.screen_size / 2 + tile * width
+    high = np.inf if tile == tiles - 1 else -settings.screen_size / 2 + (tile + 1) * width
+    nearby = (owner == tile) | ((position[:, 0] >= low - reach) & (position[:, 0] < high + reach))
+    rows = np.flatnonzero(nearby)
+    return rows, owner[rows] == tile
+
+
+def _attach(layout, blocks):
+    """Attach to the shared blocks of the given layout, closing blocks of an older layout"""
+    for block in blocks.values():
+        block.close()
+    blocks.clear()
+    columns = {}
+    for name, (block_name, shape, dtype) in layout.items():
+        blocks[name] = shared_memory.SharedMemory(name=block_name)
+        columns[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return columns
+
+
+def _worker(tile, tiles, seed, regions, connection):
+    """Worker process stepping one tile. Receives one command per step and replies once it is done,
+    with the (candidates, contacts) counts of the step"""
+    streams = random_streams.RandomStreams(seed, regions)
+    grid = spatial_grid.SpatialGrid(settings.screen_size)
+    blocks = {}
+    columns = {}
+    moving = None  # rows owned during the target step, they are the ones to move
+    while True:
+        command = connection.recv()
+        if command[0] == "stop":
+            break
+        step, size, turn, speed_factors, reach, layout = command
+        if layout is not None:
+            columns = {}  # drop views before closing the old blocks
+            columns = _attach(layout, blocks)
+
+        if step == "target":
+            # owned rows plus every neighbor they can see
+            rows, owned = tile_rows(columns, size, streams, tile, tiles, reach)
+            local = LocalRows(columns, rows)
+            grid.build(local.column("position"), spatial_grid.cell_size_for(local, settings.general["battle_range"]))
+            simulation_steps.set_target(local, grid, streams, turn, owned)
+            local.scatter(["destination", "direction"], owned)
+            moving = rows[owned]
+            counts = (grid.get_candidates(), 0)
+        elif step == "move":
+            # moving needs no neighbors. Ownership was fixed in the target step, positions did not change since,
+            # recomputing it here would race with the other workers moving their rows across the boundary
+            local = LocalRows(columns, moving)
+            simulation_steps.move(local, speed_factors)
+            local.scatter(["position", "destination"], slice(None))
+            counts = (0, 0)
+        elif step == "battle":
+            # every attacker of an owned organism and every target of an owned attacker is within battle range
+            rows, owned = tile_rows(columns, size, streams, tile, tiles, settings.general["battle_range"])
+            local = LocalRows(columns, rows)
+            grid.build(local.column("position"), settings.general["battle_range"])
+            contacts = simulation_steps.battle(local, grid, owned)
+            local.scatter(["health", "energy", "damage_taken"], owned)
+            counts = (grid.get_candidates(), contacts)
+        connection.send(counts)
+
+    columns = {}
+    for block in blocks.values():
+        block.close()
+    connection.close()
+
+
+class DomainSimulation(simulation.Simulation):
+    """Simulation that splits the world into vertical strips, each stepped by its own worker process.
+    Organism state lives in shared memory. For every step each worker gathers the organisms it owns plus a ghost
+    region as wide as the largest vision (or the battle range), updates only the organisms it owns and writes
+    them back in place. Ownership follows position, so organisms crossing a strip boundary migrate to the
+    neighboring worker on the next step. Aging, deaths and births run in the coordinating process.
+    For a given seed the results are identical to Simulation for any worker count.
+    The worker count must divide settings.general["rng_regions"]. Call close() when done."""
+    def __init__(self, prey_attributes, pred_attributes, save_data=None, seed=None, workers=2):
+        super().__init__(prey_attributes, pred_attributes, save_data, seed)
+        regions = self._streams.get_regions()
+        if workers < 1 or regions % workers != 0:
+            raise ValueError("workers must divide settings.general[\"rng_regions\"] (" + str(regions) + ")")
+
+        self._organisms = SharedPopulation(self._organisms)
+        self._sent_version = None
+        self._connections = []
+        self._workers = []
+        for tile in range(workers):
+            parent_end, child_end = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_worker,
+                                             args=(tile, workers, self._streams.get_seed(), regions, child_end),
+                                             daemon=True)
+            worker.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_workers(self):
+        return len(self._workers)
+
+    def _interact(self):
+        """Run steps 1 to 3 of the turn on the worker processes, one barrier per step"""
+        organisms = self._organisms
+        if len(organisms) == 0:
+            return
+        reach = float(organisms.column("vision").max())
+        for step, name in (("target", "set_target"), ("move", "move"), ("battle", "battle")):
+            start = self._profiler.start()
+            candidates, contacts = self.__run(step, reach)
+            self._profiler.stop(name, start)
+            self._profiler.count("candidates", candidates)
+            self._profiler.count("contacts", contacts)
+
+    def __run(self, step, reach):
+        """Send one step to every worker and wait until all of them finished it.
+        Returns the (candidates, contacts) counts summed over the workers"""
+        version, layout = self._organisms.get_layout()
+        if version == self._sent_version:
+            layout = None  # workers are attached to the current blocks already
+        self._sent_version = version
+
+        command = (step,
+                   len(self._organisms),
+                   self._session_stats.get_general_stats()["turn"],
+                   self._speed_factors,
+                   reach,
+                   layout)
+        for connection in self._connections:
+            connection.send(command)
+        candidates = 0
+        contacts = 0
+        for connection in self._connections:
+            counts = connection.recv()
+            candidates += counts[0]
+            contacts += counts[1]
+        return candidates, contacts
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        for connection in self._connections:
+            connection.send(("stop",))
+        for worker in self._workers:
+            worker.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._workers = []
+        if isinstance(self._organisms, SharedPopulation):
+            # keep a private copy of the final state around for inspection
+            shared = self._organisms
+            self._organisms = population.Population(shared.get_capacity())
+            self._organisms.copy_from(shared)
+            shared.close()
@@ -0,0 +1,394 @@
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+import os
+import queue
+import time
+import numpy as np
+import settings
+import autosave
+import checkpoint
+import frame_scheduler
+import recorder
+import renderer
+import simulation
+import time_series
+
+# slots of the shared frame state array
+LATEST = 0  # buffer holding the newest complete frame, -1 before the first one
+READING = 1  # buffer the viewer is drawing from, -1 when none
+GENERATION = 2  # incremented whenever the buffers are replaced by larger ones
+COUNT = 3  # organisms in buffer 0 and 1, at COUNT and COUNT + 1
+TURN = 5  # turn of the frame in buffer 0 and 1, at TURN and TURN + 1
+state_size = 7
+
+
+class FrameBuffers:
+    """Pair of shared memory frame buffers holding organism positions (float32 x, y) and identifiers.
+    The engine process creates them, the viewer attaches to them by name."""
+    def __init__(self, capacity, names=None):
+        self._capacity = capacity
+        size = capacity * (2 * np.dtype(np.float32).itemsize + np.dtype(np.int8).itemsize)
+        if names is None:
+            self._blocks = [shared_memory.SharedMemory(create=True, size=max(size, 1)) for buffer in range(2)]
+        else:
+            self._blocks = [shared_memory.SharedMemory(name=name) for name in names]
+            if os.name == "posix" and multiprocessing.get_start_method() != "fork":
+                # attaching registers the blocks for cleanup with this process's own resource tracker,
+                # but only the engine process that created them may free them. A forked engine shares
+                # the viewer's tracker, where its own unlink already unregisters them
+                for block in self._blocks:
+                    resource_tracker.unregister(block._name, "shared_memory")
+
+        self._positions = []
+        self._identifiers = []
+        for block in self._blocks:
+            self._positions.append(np.ndarray((capacity, 2), dtype=np.float32, buffer=block.buf))
+            self._identifiers.append(np.ndarray((capacity,), dtype=np.int8, buffer=block.buf,
+                                                offset=capacity * 2 * np.dtype(np.float32).itemsize))
+
+    def get_capacity(self):
+        return self._capacity
+
+    def get_names(self):
+        return [block.name for block in self._blocks]
+
+    def get_positions(self, buffer):
+        return self._positions[buffer]
+
+    def get_identifiers(self, buffer):
+        return self._identifiers[buffer]
+
+    def close(self, unlink=False):
+        """Detach from the blocks, also freeing them if unlink is True"""
+        self._positions = []
+        self._identifiers = []
+        for block in self._blocks:
+            block.close()
+            if unlink:
+                block.unlink()
+        self._blocks = []
+
+
+def snapshot(session_stats, profile, turns_per_second=0.0, new_turns=0):
+    """Return a small picklable copy of the statistics shown by the simulation window, with the
+    throughput since the previous snapshot and the per-turn records of the last new_turns turns.
+    Records beyond chart_points are sampled evenly, always keeping the newest"""
+    records = session_stats.get_series().get(last=new_turns)
+    stride = max(len(records) // settings.general["chart_points"], 1)
+    return {"series": records[(len(records) - 1) % stride::stride] if len(records) else records,
+            "pred": dict(session_stats.get_pred_stats()),
+            "prey": dict(session_stats.get_prey_stats()),
+            "general": dict(session_stats.get_general_stats()),
+            "time": session_stats.get_time_str(),
+            "profile": profile.get_summary(),
+            "turns_per_second": turns_per_second,
+            "seconds_per_turn": profile.get_turn_seconds()}
+
+
+def _publish(buffers, state, organisms, turn):
+    """Copy positions and identifiers into the buffer the viewer is not reading and make it the latest.
+    Returns False, dropping the frame, when the viewer still holds that buffer"""
+    with state.get_lock():
+        back = 0 if state[LATEST] < 0 else 1 - state[LATEST]
+        if state[READING] == back:
+            return False
+    count = len(organisms)
+    buffers.get_positions(back)[:count] = organisms.column("position")
+    buffers.get_identifiers(back)[:count] = organisms.column("identifier")
+    with state.get_lock():
+        state[COUNT + back] = count
+        state[TURN + back] = turn
+        state[LATEST] = back
+    return True
+
+
+def _run(prey_attributes, pred_attributes, save_data, general, state, control, status):
+    """Engine process entry point. An exception that ends the engine, e.g. bad load data or a failed turn,
+    is reported to the viewer before the process exits"""
+    try:
+        _serve(prey_attributes, pred_attributes, save_data, general, state, control, status)
+    except Exception as error:
+        status.put(("failed", type(error).__name__ + ": " + str(error)))
+        raise
+
+
+def _serve(prey_attributes, pred_attributes, save_data, general, state, control, status):
+    """Steps the simulation, publishes frames at most frame_rate times per second
+    and statistics at most stats_rate times per second, and handles the messages of the control
+    queue between slices of turns"""
+    settings.general.update(general)  # a spawned process starts from the defaults in settings
+    engine = simulation.Simulation(prey_attributes, pred_attributes, save_data)
+    organisms = engine.get_organisms()
+    session_stats = engine.get_stats()
+    profile = engine.get_profiler()
+    scheduler = frame_scheduler.FrameScheduler(settings.general)
+    frame_time = 1 / settings.general["frame_rate"]
+    stats_time = 1 / settings.general["stats_rate"]
+    autosaver = autosave.Autosaver(settings.general["autosave_directory"],
+                                   settings.general["autosave_turns"],
+                                   settings.general["autosave_seconds"],
+                                   settings.general["autosave_keep"])
+    engine.add_observer(autosaver)
+    trajectory_recorder = None
+    if settings.general["record_trajectories"]:
+        trajectory_recorder = recorder.TrajectoryRecorder(
+            recorder.create_run_directory(settings.general["recording_directory"]))
+        engine.add_observer(trajectory_recorder)
+
+    def new_turns(since):
+        """Return the number of turns finished after the given turn, every turn in memory for None"""
+        if since is None:
+            return len(session_stats.get_series())
+        return session_stats.get_general_stats()["turn"] - since
+
+    buffers = None
+    retired = []  # smaller buffers replaced while the population grew, freed on stop
+    last_publish = None
+    last_stats = None  # time and turn of the last statistics sent, for the throughput
+    sent_turn = None  # last turn whose per-turn record was sent, None to send every record in memory
+    paused = False
+    running = True
+    while running:
+        # grow the frame buffers before the population outgrows them
+        if buffers is None or len(organisms) > buffers.get_capacity():
+            if buffers is not None:
+                retired.append(buffers)
+            buffers = FrameBuffers(max(2 * len(organisms), 64))
+            with state.get_lock():
+                state[LATEST] = -1
+                state[GENERATION] += 1
+                generation = state[GENERATION]
+            status.put(("buffers", buffers.get_names(), buffers.get_capacity(), generation))
+
+        # publish the latest state, frames beyond the display frame rate would never be seen.
+        # paced slices already last a frame each
+        if last_publish is None or (scheduler.frame_due() and (scheduler.get_mode() == frame_scheduler.PACED or
+                                                               time.perf_counter() - last_publish >= frame_time)):
+            if _publish(buffers, state, organisms, session_stats.get_general_stats()["turn"]):
+                scheduler.rendered()
+                last_publish = time.perf_counter()
+
+        # statistics are only read by people, a few times per second is enough, whatever the frame rate
+        now = time.perf_counter()
+        if last_stats is None or now - last_stats[0] >= stats_time:
+            turn = session_stats.get_general_stats()["turn"]
+            rate = 0.0
+            if last_stats is not None:
+                rate = (turn - last_stats[1]) / (now - last_stats[0])
+            status.put(("stats", snapshot(session_stats, profile, rate, new_turns(sent_turn))))
+            last_stats = (now, turn)
+            sent_turn = turn
+            for error in autosaver.pop_errors():
+                status.put(("error", error))
+
+        # handle every pending control message, waiting for one while paused
+        while True:
+            try:
+                message = control.get(block=paused)
+            except queue.Empty:
+                break
+            if message[0] == "pause":
+                paused = message[1]
+                if paused:
+                    # show the exact state while paused
+                    status.put(("stats", snapshot(session_stats, profile, 0.0, new_turns(sent_turn))))
+                    sent_turn = session_stats.get_general_stats()["turn"]
+                else:
+                    session_stats.reset_start_time()  # restart stopwatch from current time
+                    last_stats = None
+            elif message[0] == "speed":
+                engine.get_speed_factors().set_fast_forward(message[1])
+            elif message[0] == "render_mode":
+                scheduler.set_mode(message[1], message[2])
+            elif message[0] == "save":
+                try:
+                    checkpoint.save(message[1], organisms, session_stats)
+                except OSError as error:
+                    status.put(("error", "Could not save the simulation.\n\n" + str(error)))
+            elif message[0] == "profile":
+                try:
+                    profile.dump(message[1], session_stats.get_general_stats()["turn"])
+                except OSError as error:
+                    status.put(("error", "Could not save the profile.\n\n" + str(error)))
+            elif message[0] == "stop":
+                running = False
+                break
+
+        if running and not paused:
+            scheduler.run_slice(engine)
+
+    autosaver.close()
+    if trajectory_recorder is not None:
+        trajectory_recorder.close()
+    status.put(("stopped", session_stats))
+    for old in retired + [buffers]:
+        old.close(unlink=True)
+
+
+class EngineError(RuntimeError):
+    """The engine process ended without being stopped"""
+
+
+class EngineProcess:
+    """Runs a Simulation in a separate process so its turns never block the Tk event loop.
+    Finished frames arrive through double-buffered shared memory, statistics through a status queue,
+    and pause, speed, render mode, save and stop requests are sent as control messages.
+    Waits on the engine check every liveness_interval seconds that it is still running, so a dead
+    engine is reported instead of blocking the viewer forever."""
+    liveness_interval = 0.5
+    def __init__(self, prey_attributes, pred_attributes, save_data=None):
+        self._state = multiprocessing.Array("q", state_size)
+        self._state[LATEST] = -1
+        self._state[READING] = -1
+        self._control = multiprocessing.Queue()
+        self._status = multiprocessing.Queue()
+        self._buffers = None
+        self._generation = 0
+        self._reading = False
+        self._stats = None
+        self._final_stats = None  # Statistics handed back by the engine when stopped
+        self._failure = None  # error reported by the engine before it ended
+        self._series = []  # per-turn records received since the last pop_series()
+        self._errors = []  # messages of failed requests, shown by the window
+        self._stopped = False
+        if multiprocessing.get_start_method() == "fork":
+            # start the resource tracker before forking, so the engine always shares it, see FrameBuffers
+            resource_tracker.ensure_running()
+        self._process = multiprocessing.Process(target=_run,
+                                                args=(prey_attributes, pred_attributes, save_data,
+                                                      dict(settings.general), self._state, self._control,
+                                                      self._status),
+                                                daemon=True)
+        self._process.start()
+
+        # wait for the starting population, so the window has statistics to show
+        try:
+            while self._stats is None:
+                self.__handle(self.__receive())
+        except EngineError:
+            self.__close()
+            raise
+
+    def send(self, *message):
+        """Send a control message: ("pause", bool), ("speed", fast_forward), ("render_mode", mode, every),
+        ("save", file_name) or ("profile", file_name)"""
+        if not self._stopped:
+            self._control.put(message)
+
+    def poll(self):
+        """Handle every pending status message. Returns the latest statistics snapshot"""
+        while True:
+            try:
+                message = self._status.get_nowait()
+            except queue.Empty:
+                break
+            self.__handle(message)
+        if not self._stopped and not self._process.is_alive():
+            # the engine died between turns, show why and stop drawing its frames
+            self._errors.append(self.__failure_message())
+            self.__close()
+        return self._stats
+
+    def get_stats(self):
+        return self._stats
+
+    def pop_series(self):
+        """Return and forget the per-turn statistics records received since the last call, oldest first"""
+        if not self._series:
+            return np.zeros(0, dtype=time_series.record_dtype)
+        series = np.concatenate(self._series)
+        self._series = []
+        return series
+
+    def pop_errors(self):
+        """Return and forget the error messages received since the last call"""
+        errors = self._errors
+        self._errors = []
+        return errors
+
+    def is_stopped(self):
+        return self._stopped
+
+    def acquire_frame(self):
+        """Return the newest complete Frame, or None when there is none yet.
+        The frame stays valid, and is never overwritten, until release_frame()"""
+        with self._state.get_lock():
+            latest = self._state[LATEST]
+            if latest < 0 or self._buffers is None or self._state[GENERATION] != self._generation:
+                return None  # no frame yet, or frame buffers not attached yet
+            self._state[READING] = latest
+            count = self._state[COUNT + latest]
+            turn = self._state[TURN + latest]
+        self._reading = True
+        return renderer.Frame({"position": self._buffers.get_positions(latest)[:count],
+                               "identifier": self._buffers.get_identifiers(latest)[:count]},
+                              turn)
+
+    def release_frame(self):
+        """Let the engine reuse the buffer of the last acquired frame"""
+        with self._state.get_lock():
+            self._state[READING] = -1
+        self._reading = False
+
+    def stop(self):
+        """Stop the engine process and return its final Statistics, None when the engine had died,
+        its error is then available from pop_errors()"""
+        if self._stopped:
+            return self._final_stats
+        if self._reading:
+            self.release_frame()
+        self._control.put(("stop",))
+        try:
+            while self._final_stats is None:
+                self.__handle(self.__receive())
+        except EngineError as error:
+            self._errors.append(str(error))
+        self.__close()
+        return self._final_stats
+
+    def __receive(self):
+        """Return the next status message, raising EngineError when the engine process ended instead"""
+        while True:
+            try:
+                return self._status.get(timeout=self.liveness_interval)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    break
+        try:
+            # messages the engine sent right before it ended
+            return self._status.get_nowait()
+        except queue.Empty:
+            raise EngineError(self.__failure_message())
+
+    def __failure_message(self):
+        """Return why the engine process ended, its error or exit code"""
+        self._process.join()
+        if self._failure is not None:
+            return "The simulation engine failed.\n\n" + self._failure
+        return "The simulation engine stopped unexpectedly (exit code " + str(self._process.exitcode) + ")."
+
+    def __close(self):
+        """Detach from the frame buffers and wait for the engine process to end"""
+        self._process.join()
+        if self._buffers is not None:
+            self._buffers.close()
+            self._buffers = None
+        self._stopped = True
+
+    def __handle(self, message):
+        """Apply one status message from the engine process"""
+        if message[0] == "buffers":
+            if self._buffers is not None:
+                self._buffers.close()
+            self._buffers = FrameBuffers(message[2], message[1])
+            self._generation = message[3]
+        elif message[0] == "stats":
+            self._stats = message[1]
+            self._series.append(message[1]["series"])
+        elif message[0] == "error":
+            self._errors.append(message[1])
+        elif message[0] == "failed":
+            self._failure = message[1]
+        elif message[0] == "stopped":
+            self._final_stats = message[1]
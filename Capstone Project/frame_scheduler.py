@@ -0,0 +1,92 @@
+import time
+
+# render modes
+PACED = "paced"  # turns per frame picked by SpeedControl.pace() for a steady on-screen speed
+FRAME_BUDGET = "frame_budget"  # as many turns as fit in one frame at the target frame rate
+EVERY_N_TURNS = "every_n_turns"  # render after a fixed number of turns
+UNLIMITED = "unlimited"  # full CPU speed, render only every few seconds
+
+# render mode choices offered in the simulation window, label -> (mode, turns per frame)
+choices = {"Paced": (PACED, 1),
+           "30 FPS": (FRAME_BUDGET, 1),
+           "Every turn": (EVERY_N_TURNS, 1),
+           "Every 10 turns": (EVERY_N_TURNS, 10),
+           "Every 100 turns": (EVERY_N_TURNS, 100),
+           "Unlimited": (UNLIMITED, 1)}
+
+
+class FrameScheduler:
+    """Decides how many simulation turns run between two rendered frames, so slow rendering
+    no longer slows the simulation down. Each call to run_slice() runs a slice of turns that
+    fits in one frame, frame_due() then tells whether the latest state should be drawn."""
+    def __init__(self, general):
+        self._mode = general["render_mode"]
+        self._render_every = general["render_every"]
+        self._frame_time = 1 / general["frame_rate"]
+        self._unlimited_interval = general["unlimited_render_interval"]
+        self._last_render = time.perf_counter()
+        self._due = True
+        self._slice_end = None  # when the last slice of turns ended
+
+    def get_mode(self):
+        return self._mode
+
+    def set_mode(self, mode, render_every=1):
+        """Switch to another render mode. render_every is only used by EVERY_N_TURNS"""
+        self._mode = mode
+        self._render_every = max(int(render_every), 1)
+
+    def run_slice(self, engine):
+        """Run the next slice of turns on engine, always at least one. Returns the number of turns run"""
+        if self._mode == PACED:
+            return self.__run_paced(engine)
+        if self._mode == EVERY_N_TURNS:
+            # fast-forward runs that many times the turns between frames
+            turns = self._render_every * engine.get_speed_factors().get_fast_forward()
+            engine.step(turns)
+            self._due = True
+            return turns
+
+        # fill the frame with turns, the viewer draws in its own process so drawing takes no time from them
+        start = time.perf_counter()
+        turns = 0
+        while True:
+            engine.step()
+            turns += 1
+            if time.perf_counter() - start >= self._frame_time:
+                break
+
+        if self._mode == FRAME_BUDGET:
+            self._due = True
+        else:
+            self._due = time.perf_counter() - self._last_render >= self._unlimited_interval
+        return turns
+
+    def __run_paced(self, engine):
+        """Run the turns per frame chosen by the engine's SpeedControl, wait out the rest of the frame,
+        then feed the measured turn and frame times back to it"""
+        speed_factors = engine.get_speed_factors()
+        start = time.perf_counter()
+        # time since the last slice went to publishing the frame and handling messages
+        outside = 0 if self._slice_end is None else start - self._slice_end
+        turns = speed_factors.get_turns_per_frame()
+        engine.step(turns)
+        elapsed = time.perf_counter() - start
+        speed_factors.pace(elapsed / turns, outside)
+
+        # hold the frame rate, running ahead would move organisms faster than the target speed
+        remaining = self._frame_time - outside - elapsed
+        if remaining > 0:
+            time.sleep(remaining)
+        self._slice_end = time.perf_counter()
+        self._due = True
+        return turns
+
+    def frame_due(self):
+        """Return whether the state reached by the last slice should be rendered"""
+        return self._due
+
+    def rendered(self):
+        """Record that a frame was handed to the viewer"""
+        self._last_render = time.perf_counter()
+        self._due = False
@@ -0,0 +1,139 @@
+import numpy as np
+import population
+
+# append-only columns of one entry per organism, indexed by uid
+fields = {"parent": np.int64,  # uid of the parent, -1 for founders and organisms of unknown origin
+          "birth_turn": np.int32,  # -1 when unknown, e.g. alive in a checkpoint without lineage
+          "death_turn": np.int32,  # -1 while alive
+          "generation": np.int32,
+          "identifier": np.int8}
+# genome at birth, float32 per mutable field
+trait_fields = population.mutable_fields
+
+initial_capacity = 1024
+
+
+class Lineage:
+    """Phylogeny of a session: who descends from whom, when each organism was born and died,
+    and its mutated genome at birth. Uids are dense and never reused, so every field is one
+    contiguous array indexed by uid, about 37 bytes per organism, doubled when full.
+    Only numbers are kept, never references into the population, and rows are never removed.
+    Turns are numbered like the statistics series: founders are born at turn 0,
+    births and deaths during the first turn happen at turn 1."""
+    def __init__(self, capacity=initial_capacity):
+        self._size = 0  # one past the largest uid recorded
+        self._columns = {}
+        for name, dtype in fields.items():
+            self._columns[name] = np.full(capacity, -1, dtype=dtype)
+        self._columns["traits"] = np.zeros((capacity, len(trait_fields)), dtype=np.float32)
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        """Return the named column of every uid recorded so far, traits as an (n, 4) array"""
+        return self._columns[name][:self._size]
+
+    def get_columns(self):
+        """Return every column trimmed to the recorded uids, e.g. for a checkpoint"""
+        return {name: array[:self._size] for name, array in self._columns.items()}
+
+    def snapshot(self):
+        """Return every column like get_columns(), copying only the death turns. Every other field of a uid
+        is written once at birth, and grown columns are new arrays, so views of the recorded uids stay
+        valid while the session goes on, e.g. while a checkpoint is written in the background"""
+        columns = self.get_columns()
+        columns["death_turn"] = columns["death_turn"].copy()
+        return columns
+
+    def restore(self, columns):
+        """Replace every entry with columns returned by get_columns()"""
+        size = len(columns["parent"])
+        self._size = 0
+        self.__reserve(size)
+        for name, array in self._columns.items():
+            array[:size] = columns[name]
+        self._size = size
+
+    def record_births(self, uids, parents, turn, identifier, generation, traits):
+        """Append the organisms with the given uids, born at turn to the given parent uids (-1 for none).
+        traits maps each of trait_fields to the genome of each newborn"""
+        if len(uids) == 0:
+            return
+        self.__reserve(int(uids.max()) + 1)
+        columns = self._columns
+        columns["parent"][uids] = parents
+        columns["birth_turn"][uids] = turn
+        columns["death_turn"][uids] = -1
+        columns["generation"][uids] = generation
+        columns["identifier"][uids] = identifier
+        for k, name in enumerate(trait_fields):
+            columns["traits"][uids, k] = traits[name]
+
+    def record_deaths(self, uids, turn):
+        """Set the death turn of the organisms with the given uids"""
+        if len(uids) == 0:
+            return
+        self.__reserve(int(uids.max()) + 1)
+        self._columns["death_turn"][uids] = turn
+
+    def get_parent(self, uid):
+        """Return the parent uid of uid, -1 for founders"""
+        return int(self._columns["parent"][uid]) if 0 <= uid < self._size else -1
+
+    def ancestry(self, uid):
+        """Return the uids from uid back to its founder, uid first"""
+        parent = self._columns["parent"]
+        chain = []
+        while 0 <= uid < self._size:
+            chain.append(uid)
+            uid = int(parent[uid])
+        return np.array(chain, dtype=np.int64)
+
+    def common_ancestor(self, first, second):
+        """Return the uid of the most recent common ancestor of two organisms, either one itself
+        if it descends from the other, or -1 when they descend from different founders"""
+        chain = self.ancestry(first)
+        shared = np.isin(chain, self.ancestry(second))
+        if not shared.any():
+            return -1
+        return int(chain[np.argmax(shared)])
+
+    def descendant_counts(self):
+        """Return the number of descendants, over all generations, of every uid.
+        Parents always have smaller generations than their children, so counts are
+        pushed up one generation at a time, youngest first, in O(n) overall"""
+        parent = self.column("parent")
+        generation = self.column("generation")
+        counts = np.zeros(self._size, dtype=np.int64)
+        order = np.argsort(generation, kind="stable")
+        bounds = np.searchsorted(generation[order], np.arange(generation.max(initial=0) + 2))
+        for level in range(len(bounds) - 2, 0, -1):
+            rows = order[bounds[level]:bounds[level + 1]]
+            rows = rows[parent[rows] >= 0]
+            np.add.at(counts, parent[rows], counts[rows] + 1)
+        return counts
+
+    def descendant_count(self, uid):
+        """Return the number of descendants, over all generations, of one uid"""
+        return int(self.descendant_counts()[uid])
+
+    def living(self):
+        """Return the recorded uids that have not died"""
+        return np.flatnonzero((self.column("death_turn") < 0) & (self.column("identifier") >= 0))
+
+    def __reserve(self, required):
+        """Grow every column by doubling until it holds the required number of uids,
+        uids skipped since the last recorded one stay unknown"""
+        capacity = len(self._columns["parent"])
+        if required > capacity:
+            while capacity < required:
+                capacity *= 2
+            for name, array in self._columns.items():
+                if name == "traits":
+                    grown = np.zeros((capacity, array.shape[1]), dtype=array.dtype)
+                else:
+                    grown = np.full(capacity, -1, dtype=array.dtype)
+                grown[:self._size] = array[:self._size]
+                self._columns[name] = grown
+        self._size = max(self._size, required)
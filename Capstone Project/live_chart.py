@@ -0,0 +1,85 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import settings
+
+# plotted fields of the per-turn statistics records and their colors
+lines = {"pred_population": settings.pred_color,
+         "prey_population": settings.prey_color}
+
+
+class LiveChart:
+    """Population chart embedded in a tkinter widget, updated while the simulation runs.
+    New per-turn records are appended to the plotted arrays, and once more than points are held,
+    the older half is thinned to every other point, so old history gets coarser while the recent
+    turns stay at full resolution. Only the lines are redrawn, blitted over a cached background
+    of the axes, the whole figure is only drawn again when the data outgrows the axis limits."""
+    def __init__(self, master, points=None):
+        self._points = max(int(settings.general["chart_points"] if points is None else points), 4)
+        self._turn = np.zeros(0)
+        self._values = {name: np.zeros(0) for name in lines}
+
+        self._figure = Figure(figsize=(3.2, 2.2), dpi=100)
+        self._axes = self._figure.add_subplot()
+        self._axes.set(xlabel="Turn", ylabel="Population")
+        self._axes.set_xlim(0, 100)
+        self._axes.set_ylim(0, 100)
+        self._figure.tight_layout()
+        self._lines = {}
+        for name, color in lines.items():
+            # animated lines are left out of full draws and only drawn by blitting
+            self._lines[name] = self._axes.plot([], [], color=color, animated=True)[0]
+
+        self._canvas = FigureCanvasTkAgg(self._figure, master=master)
+        self._background = None
+        self._canvas.mpl_connect("draw_event", self.__on_draw)
+        self._canvas.draw()
+
+    def get_widget(self):
+        """Return the tkinter widget to place in the window"""
+        return self._canvas.get_tk_widget()
+
+    def update(self, records):
+        """Append per-turn statistics records, oldest first, and redraw the lines"""
+        if len(records) == 0:
+            return
+        self._turn = np.concatenate((self._turn, records["turn"]))
+        for name in lines:
+            self._values[name] = np.concatenate((self._values[name], records[name]))
+        while len(self._turn) > self._points:
+            self.__thin()
+        for name, line in self._lines.items():
+            line.set_data(self._turn, self._values[name])
+
+        # grow the limits by half again when the data leaves them, drawing the figure from scratch
+        top = max(values.max() for values in self._values.values())
+        left, right = self._axes.get_xlim()
+        if self._turn[-1] > right or self._turn[0] < left or top > self._axes.get_ylim()[1]:
+            self._axes.set_xlim(self._turn[0], max(self._turn[-1] * 1.5, 100))
+            self._axes.set_ylim(0, max(top * 1.5, 100))
+            self._canvas.draw()
+        else:
+            self.__blit()
+
+    def __thin(self):
+        """Keep every other point of the older half of the plotted history"""
+        older = len(self._turn) - self._points // 2
+        keep = np.concatenate((np.arange(0, older, 2), np.arange(older, len(self._turn))))
+        self._turn = self._turn[keep]
+        for name in lines:
+            self._values[name] = self._values[name][keep]
+
+    def __blit(self):
+        """Draw the lines over the cached background of the axes"""
+        if self._background is None:
+            return
+        self._canvas.restore_region(self._background)
+        for line in self._lines.values():
+            self._axes.draw_artist(line)
+        self._canvas.blit(self._axes.bbox)
+
+    def __on_draw(self, event):
+        """Cache the freshly drawn background, e.g. after new limits or a resize, then draw the lines on it"""
+        self._background = self._canvas.copy_from_bbox(self._axes.bbox)
+        for line in self._lines.values():
+            self._axes.draw_artist(line)
@@ -3,7 +3,8 @@ import simulation_window
 import tkinter
 import tkinter.filedialog as filemanager
 import os
-import pickle
+import zipfile
+import checkpoint
 import tktooltip
 
 
@@ -39,7 +40,7 @@ def center_window(window):
     window.geometry("+" + str(x_coord) + "+" + str(y_coord))
 
 
-def change_to_parameters(root, organisms, prey_attributes, pred_attributes, initialize=False):
+def change_to_parameters(root, prey_attributes, pred_attributes, initialize=False):
     """Build Parameters screen"""
     # remove any existing widgets
     for child in root.winfo_children():
@@ -481,7 +482,7 @@ def change_to_parameters(root, organisms, prey_attributes, pred_attributes, init
         # ------------------------------
         # change to simulation screen
         # ------------------------------
-        simulation_window.change_to_simulation(root, organisms, prey_attributes, pred_attributes)
+        simulation_window.change_to_simulation(root, prey_attributes, pred_attributes)
 
     start_button = tkinter.Button(button_frame,
                                   text="Start",
@@ -501,31 +502,25 @@ def change_to_parameters(root, organisms, prey_attributes, pred_attributes, init
         # get file to load
         file_name = filemanager.askopenfilename(initialfile='a_life_save',
                                                 initialdir=os.getcwd(),
-                                                filetypes=[('Pickle File', '*.pkl')],
-                                                defaultextension='.pkl')
+                                                filetypes=[('Checkpoint File', '*' + checkpoint.extension)],
+                                                defaultextension=checkpoint.extension)
         # if file selected, load data and restart simulation
         if file_name:
-            with open(file_name, 'rb') as load_file:
-                # check for bad file
-                try:
-                    pickle_data = pickle.load(load_file)
-                except (pickle.UnpicklingError, AttributeError, EOFError, IndexError):
-                    popup(root, "Bad file. Please try again.")
-                    return
-                except ImportError:
-                    popup(root, "Error importing module associated with file."
-                                "\n\nPlease try again.")
-                    return
-                except Exception:
-                    popup(root, "Unknown error occurred. Please try again.")
-                    return
+            # check for bad file
+            try:
+                save_data = checkpoint.load(file_name)
+            except (ValueError, KeyError, OSError, zipfile.BadZipFile):
+                popup(root, "Bad file. Please try again.")
+                return
+            except Exception:
+                popup(root, "Unknown error occurred. Please try again.")
+                return
 
             # switch to simulation window with load data
             simulation_window.change_to_simulation(root,
-                                                   organisms,
                                                    settings.prey_attributes,
                                                    settings.pred_attributes,
-                                                   pickle_data)
+                                                   save_data)
 
     load_button = tkinter.Button(button_frame,
                                  text="Load",
@@ -537,6 +532,28 @@ def change_to_parameters(root, organisms, prey_attributes, pred_attributes, init
                       msg=settings.tooltip["load_button"],
                       delay=settings.delay_long)
 
+    # ------------------------------
+    # replay button
+    # ------------------------------
+    def replay():
+        """Play back a recorded run without simulating"""
+        directory = filemanager.askdirectory(initialdir=os.getcwd(), mustexist=True)
+        if directory:
+            try:
+                simulation_window.change_to_replay(root, directory)
+            except (ValueError, KeyError, OSError):
+                popup(root, "Not a recording. Please try again.")
+
+    replay_button = tkinter.Button(button_frame,
+                                   text="Replay",
+                                   command=replay,
+                                   height=settings.button_height,
+                                   width=settings.button_width)
+    replay_button.pack(side="left")
+    tktooltip.ToolTip(replay_button,
+                      msg=settings.tooltip["replay_button"],
+                      delay=settings.delay_long)
+
     # -----------------------------------------------------------------------------
     # center tkinter window
     # -----------------------------------------------------------------------------
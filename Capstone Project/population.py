@@ -0,0 +1,196 @@
+import numpy as np
+
+# scalar state fields stored as one contiguous column each
+scalar_fields = {"direction": np.float64,
+                 "vision": np.float64,
+                 "peripheral": np.float64,
+                 "speed": np.float64,
+                 "damage": np.float64,
+                 "separation_weight": np.float64,
+                 "birth_rate": np.float64,
+                 "mutation_rate": np.float64,
+                 "health": np.float64,
+                 "damage_taken": np.float64,  # battle damage received in the current turn
+                 "energy": np.float64,
+                 "age": np.float64,
+                 "lifespan": np.float64,
+                 "generation": np.int32,
+                 "identifier": np.int8,  # 0 for prey, 1 for predators
+                 "uid": np.int64,  # unique per organism, never reused
+                 }
+
+# [x, y] state fields stored as (capacity, 2) arrays
+vector_fields = ("position", "destination")
+
+# fields passed from parent to offspring, the first four mutate at birth
+mutable_fields = ("vision", "peripheral", "speed", "damage")
+genome_fields = mutable_fields + ("separation_weight", "birth_rate", "mutation_rate", "generation", "lifespan",
+                                  "health")
+
+initial_capacity = 64
+
+
+class Population:
+    """Struct-of-arrays store for every living organism.
+    Each state field lives in its own contiguous NumPy array. Rows [0, len) are in use,
+    the remaining capacity is doubled whenever a birth would overflow it.
+    During a turn, deaths only tombstone their row and births are staged in a nursery,
+    end_turn() then compacts and merges both in one pass each."""
+    def __init__(self, capacity=initial_capacity):
+        self._size = 0
+        self._next_uid = 0
+        self._dead = 0  # tombstoned rows awaiting compaction
+        self._nursery = None  # Population of staged births, created on first birth
+        self._columns = {}
+        for name, dtype in scalar_fields.items():
+            self._columns[name] = self._allocate(name, (capacity,), dtype)
+        for name in vector_fields:
+            self._columns[name] = self._allocate(name, (capacity, 2), np.float64)
+        self._columns["tombstone"] = self._allocate("tombstone", (capacity,), bool)
+
+    def __len__(self):
+        return self._size
+
+    def get_capacity(self):
+        return len(self._columns["uid"])
+
+    def get_next_uid(self):
+        return self._next_uid
+
+    def get_dead(self):
+        """Return the number of rows tombstoned since the last end_turn()"""
+        return self._dead
+
+    def get_staged(self):
+        """Return the number of births staged since the last end_turn()"""
+        return 0 if self._nursery is None else len(self._nursery)
+
+    def get_columns(self):
+        """Return the full-capacity column arrays. Only rows [0, len) are valid.
+        Arrays are replaced when the store grows, so never hold on to them across births"""
+        return self._columns
+
+    def column(self, name):
+        """Return a view of the valid rows of the named column"""
+        return self._columns[name][:self._size]
+
+    def append(self, identifier, position, destination, traits, mutation, uids=None):
+        """Append len(identifier) new organisms. traits maps each genome field in genome_fields to the
+        parent values (array or scalar), mutation is an (n, 4) block of uniform [-1, 1) draws that shift
+        the mutable fields by up to mutation_rate. Returns the first and one-past-last new row index"""
+        count = len(identifier)
+        if self._size + count > self.get_capacity():
+            self.__grow(self._size + count)
+        start = self._size
+        stop = start + count
+        columns = self._columns
+
+        columns["position"][start:stop] = position
+        columns["destination"][start:stop] = destination
+
+        # set attributes, mutating the mutable ones
+        for name in genome_fields:
+            columns[name][start:stop] = traits[name]
+        for k, name in enumerate(mutable_fields):
+            columns[name][start:stop] += mutation[:, k] * columns["mutation_rate"][start:stop]
+
+        identifier = np.asarray(identifier)
+        columns["identifier"][start:stop] = identifier
+        columns["age"][start:stop] = 0
+        columns["energy"][start:stop] = np.where(identifier == 0, columns["health"][start:stop], 0)
+        columns["tombstone"][start:stop] = False
+        if uids is None:
+            uids = np.arange(self._next_uid, self._next_uid + count)
+            self._next_uid += count
+        columns["uid"][start:stop] = uids
+
+        # set initial direction automatically
+        offset = columns["destination"][start:stop] - columns["position"][start:stop]
+        columns["direction"][start:stop] = np.arctan2(offset[:, 1], offset[:, 0])
+
+        self._size = stop
+        return start, stop
+
+    def kill(self, indices):
+        """Tombstone the organisms at the given row index or array of row indices with one array
+        assignment. The rows keep their index, and stay readable, until the next end_turn()"""
+        tombstone = self._columns["tombstone"]
+        rows = np.atleast_1d(indices)
+        rows = np.unique(rows[~tombstone[rows]])  # count each newly dead row once
+        tombstone[rows] = True
+        self._dead += len(rows)
+
+    def stage(self, identifier, position, destination, traits, mutation):
+        """Stage births in the nursery, see append() for the arguments. Newborns get their uid and
+        mutated genome now, but only join the population at the next end_turn().
+        Returns the nursery and the first and one-past-last staged row index within it"""
+        if self._nursery is None:
+            self._nursery = Population(initial_capacity // 4)
+        count = len(identifier)
+        uids = np.arange(self._next_uid, self._next_uid + count)
+        self._next_uid += count
+        start, stop = self._nursery.append(identifier, position, destination, traits, mutation, uids)
+        return self._nursery, start, stop
+
+    def end_turn(self):
+        """Compact away tombstoned rows, keeping the order of survivors, then append staged births"""
+        if self._dead:
+            keep = np.flatnonzero(~self._columns["tombstone"][:self._size])
+            for array in self._columns.values():
+                array[:len(keep)] = array[keep]
+            self._size = len(keep)
+            self._dead = 0
+
+        if self._nursery is not None and len(self._nursery):
+            births = len(self._nursery)
+            if self._size + births > self.get_capacity():
+                self.__grow(self._size + births)
+            for name, array in self._columns.items():
+                array[self._size:self._size + births] = self._nursery.column(name)
+            self._size += births
+            self._nursery.clear()
+
+    def copy_from(self, source):
+        """Replace the rows of this store with copies of the rows of another store between turns"""
+        self.restore({name: array[:len(source)] for name, array in source.get_columns().items()},
+                     source.get_next_uid())
+
+    def restore(self, columns, next_uid):
+        """Replace the rows of this store with the given per-field row arrays between turns.
+        Fields missing from columns are zeroed, next_uid is the uid of the next organism born"""
+        size = len(columns["uid"])
+        if size > self.get_capacity():
+            self.__grow(size)
+        for name, array in self._columns.items():
+            if name in columns:
+                array[:size] = columns[name]
+            else:
+                array[:size] = 0
+        self._size = size
+        self._dead = 0
+        self._next_uid = int(next_uid)
+
+    def clear(self):
+        """Drop every row, keeping the allocated capacity"""
+        self._size = 0
+        self._dead = 0
+
+    def __grow(self, required):
+        """Double the capacity of every column until it holds the required number of rows"""
+        capacity = max(1, self.get_capacity())
+        while capacity < required:
+            capacity *= 2
+        for name in list(self._columns):
+            array = self._columns[name]
+            grown = self._allocate(name, (capacity,) + array.shape[1:], array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._columns[name] = grown
+        del array
+        self._released()
+
+    def _allocate(self, name, shape, dtype):
+        """Return a zeroed array for the named column. Subclasses may place columns elsewhere"""
+        return np.zeros(shape, dtype=dtype)
+
+    def _released(self):
+        """Called after growing, once the store no longer references the previous column arrays"""
@@ -0,0 +1,85 @@
+import collections
+import json
+import time
+import settings
+
+# timed sections of a turn, in seconds
+timers = ("set_target", "move", "battle", "conclude_turn", "observers", "render", "stats_frame", "chart")
+# counted events of a turn
+counters = ("candidates", "contacts", "births", "deaths")
+
+
+class Profiler:
+    """Low-overhead per-turn timers and counters of the hot path.
+    Values are accumulated for the running turn, next_turn() closes it into a rolling window
+    of the last window turns, so a slowdown can be traced to neighbor search, rendering or Tk."""
+    def __init__(self, window=None):
+        self._window = settings.general["profile_window"] if window is None else window
+        self.reset()
+
+    def reset(self, window=None):
+        """Drop every recorded turn, optionally changing the window length"""
+        if window is not None:
+            self._window = window
+        self._turns = 0  # closed turns
+        self._open = False  # whether a turn is being recorded
+        self._current = dict.fromkeys(timers + counters, 0)
+        self._history = {}
+        for name in timers + counters:
+            self._history[name] = collections.deque(maxlen=self._window)
+
+    def get_window(self):
+        return self._window
+
+    def get_turns(self):
+        return self._turns
+
+    def start(self):
+        """Return a start time for stop()"""
+        return time.perf_counter()
+
+    def stop(self, name, start):
+        """Add the time since start to the named timer of the running turn"""
+        self._current[name] += time.perf_counter() - start
+
+    def count(self, name, value):
+        """Add value to the named counter of the running turn"""
+        self._current[name] += value
+
+    def next_turn(self):
+        """Close the running turn into the rolling windows and start a new one"""
+        if self._open:
+            for name, value in self._current.items():
+                self._history[name].append(value)
+            self._turns += 1
+        self._current = dict.fromkeys(self._current, 0)
+        self._open = True
+
+    def get_series(self, name):
+        """Return the per-turn values of the named timer or counter over the window, oldest first"""
+        return list(self._history[name])
+
+    def get_summary(self):
+        """Return {name: {"last", "mean", "max"}} over the window. Timers are in seconds"""
+        summary = {}
+        for name, values in self._history.items():
+            if values:
+                summary[name] = {"last": values[-1], "mean": sum(values) / len(values), "max": max(values)}
+            else:
+                summary[name] = {"last": 0, "mean": 0, "max": 0}
+        return summary
+
+    def get_turn_seconds(self):
+        """Return the mean seconds per turn over the window, summed over every timer"""
+        summary = self.get_summary()
+        return sum(summary[name]["mean"] for name in timers)
+
+    def dump(self, file_name, turn=None):
+        """Write the summary and the windowed series as JSON"""
+        data = {"turn": turn,
+                "closed_turns": self._turns,
+                "window": self._window,
+                "summary": self.get_summary(),
+                "series": {name: self.get_series(name) for name in self._history}}
+        with open(file_name, "w") as json_file:
+            json.dump(data, json_file, indent=2)
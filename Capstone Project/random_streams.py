@@ -0,0 +1,194 @@
+import numpy as np
+import settings
+
+# draw purposes, each one gets its own independent stream every turn
+PLACEMENT = 0  # starting positions and destinations
+WANDER = 1  # random destination within the visual field
+CONCLUDE = 2  # starvation and fertility rolls
+BIRTH = 3  # offspring position, destination and genome mutation
+
+# constants of NumPy's SeedSequence hash and of PCG64 seeding, see region_states()
+MASK32 = 0xFFFFFFFF
+MASK128 = (1 << 128) - 1
+POOL_SIZE = 4
+INIT_A = 0x43b0d7e5
+MULT_A = 0x931e8875
+INIT_B = 0x8b51f9dd
+MULT_B = 0x58f38ded
+MIX_MULT_L = 0xca01f9dd
+MIX_MULT_R = 0x4973f715
+XSHIFT = 16
+PCG_MULTIPLIER = 0x2360ED051FC65DA44385DF649FCCF645
+
+
+def _words(value):
+    """Split a non-negative integer into 32-bit words, least significant first, like SeedSequence"""
+    words = [value & MASK32]
+    value >>= 32
+    while value:
+        words.append(value & MASK32)
+        value >>= 32
+    return words
+
+
+def _hash_constants(hash_const, multiplier, count):
+    """Return the hash constants before and after each of count hash steps, as uint32 columns"""
+    before = []
+    after = []
+    for step in range(count):
+        before.append(hash_const)
+        hash_const = hash_const * multiplier & MASK32
+        after.append(hash_const)
+    return np.array(before, dtype=np.uint32)[:, None], np.array(after, dtype=np.uint32)[:, None], hash_const
+
+
+def _hashmix(value, hash_const):
+    """SeedSequence hashmix of one word, returns the hashed word and the next hash constant"""
+    value ^= hash_const
+    hash_const = hash_const * MULT_A & MASK32
+    value = value * hash_const & MASK32
+    return value ^ (value >> XSHIFT), hash_const
+
+
+def _mix(x, y):
+    """SeedSequence mix of two words, also applied elementwise to uint32 arrays"""
+    result = (MIX_MULT_L * x - MIX_MULT_R * y) & MASK32
+    return result ^ (result >> XSHIFT)
+
+
+# generate_state(4, np.uint64) reads the pool cyclically into 8 words with fixed hash constants
+_STATE_BEFORE, _STATE_AFTER, _ = _hash_constants(INIT_B, MULT_B, 2 * POOL_SIZE)
+_STATE_POOL = np.arange(2 * POOL_SIZE) % POOL_SIZE
+
+
+class RandomStreams:
+    """Seeded source of every random number drawn by the simulation.
+    Each (turn, purpose, region) triple owns an independent NumPy Generator derived from the run seed,
+    and organisms draw from the stream of the world region they are in, in uid order.
+    Draws therefore never depend on row order, on how many rows were drawn before,
+    or on which worker process steps a region, so a seed reproduces a run exactly."""
+    def __init__(self, seed=None, regions=None, world_size=settings.screen_size):
+        if seed is None:
+            seed = np.random.SeedSequence().generate_state(1, np.uint64)[0]  # fresh 64-bit seed
+        self._seed = int(seed)
+        self._regions = settings.general["rng_regions"] if regions is None else regions
+        self._world_size = world_size
+
+        # SeedSequence pool after the seed words, shared by every stream of the run
+        entropy = _words(self._seed)
+        entropy += [0] * (POOL_SIZE - len(entropy))  # padded to the pool size as there is a spawn key
+        hash_const = INIT_A
+        pool = []
+        for word in entropy[:POOL_SIZE]:
+            value, hash_const = _hashmix(word, hash_const)
+            pool.append(value)
+        for source in range(POOL_SIZE):
+            for target in range(POOL_SIZE):
+                if source != target:
+                    value, hash_const = _hashmix(pool[source], hash_const)
+                    pool[target] = _mix(pool[target], value)
+        self._seed_entropy = entropy[POOL_SIZE:]  # seed words beyond the pool, mixed in one at a time
+        self._seed_pool = pool
+        self._seed_hash = hash_const
+
+        # generator states of the latest (turn, purpose), reused by every region drawn from
+        self._states_key = None
+        self._states = None
+        self._bit_generator = np.random.PCG64(0)
+        self._generator = np.random.Generator(self._bit_generator)
+
+        # region_states() mirrors NumPy internals: use it only while it reproduces generator() exactly,
+        # otherwise every region gets its own SeedSequence as before, so a seed always gives the same run
+        self._fast_seeding = self.matches_generator(1, BIRTH)
+
+    def get_seed(self):
+        return self._seed
+
+    def get_regions(self):
+        return self._regions
+
+    def generator(self, turn, purpose, region=0):
+        """Return a new Generator of the given turn, purpose and region"""
+        sequence = np.random.SeedSequence(self._seed, spawn_key=(turn, purpose, region))
+        return np.random.Generator(np.random.PCG64(sequence))
+
+    def region_states(self, turn, purpose):
+        """Return the PCG64 (state, increment) of every region of the given turn and purpose.
+        Each equals the state of generator(turn, purpose, region), but instead of building a
+        SeedSequence and a PCG64 per region, the hash of the seed is computed once per run, the hash of
+        turn and purpose once per call and the region word of every region at once with uint32 arrays.
+        The states of the latest call are cached, so the regions of one draw share a single call"""
+        if self._states_key == (turn, purpose):
+            return self._states
+        pool = list(self._seed_pool)
+        hash_const = self._seed_hash
+        for word in self._seed_entropy + _words(turn) + _words(purpose):
+            for target in range(POOL_SIZE):
+                value, hash_const = _hashmix(word, hash_const)
+                pool[target] = _mix(pool[target], value)
+
+        # the region is the last entropy word, mixed into every pool word
+        before, after, hash_const = _hash_constants(hash_const, MULT_A, POOL_SIZE)
+        regions = np.arange(self._regions, dtype=np.uint32)
+        values = (regions ^ before) * after
+        values ^= values >> XSHIFT
+        pools = _mix(np.array(pool, dtype=np.uint32)[:, None], values)
+
+        # generate_state(4, np.uint64), words paired little-endian into seed and increment halves
+        words = (pools[_STATE_POOL] ^ _STATE_BEFORE) * _STATE_AFTER
+        words ^= words >> XSHIFT
+        words = words.astype(np.uint64)
+        halves = (words[0::2] | (words[1::2] << np.uint64(32))).tolist()
+
+        # pcg64_srandom_r: two LCG steps from state 0
+        states = []
+        for seed_high, seed_low, inc_high, inc_low in zip(*halves):
+            increment = ((inc_high << 64 | inc_low) << 1 | 1) & MASK128
+            state = (increment + (seed_high << 64 | seed_low)) & MASK128
+            states.append(((state * PCG_MULTIPLIER + increment) & MASK128, increment))
+        self._states_key = (turn, purpose)
+        self._states = states
+        return states
+
+    def matches_generator(self, turn, purpose):
+        """Return whether region_states() equals the state of generator() in every region of turn and purpose"""
+        states = self.region_states(turn, purpose)
+        for region in range(self._regions):
+            state = self.generator(turn, purpose, region).bit_generator.state["state"]
+            if (state["state"], state["inc"]) != states[region]:
+                return False
+        return True
+
+    def region_of(self, positions):
+        """Return the region index of each position. Regions are vertical strips of the world"""
+        width = self._world_size / self._regions
+        strip = np.floor((positions[:, 0] + self._world_size / 2) / width).astype(np.intp)
+        return np.clip(strip, 0, self._regions - 1)
+
+    def random(self, turn, purpose, positions, uids, columns=1):
+        """Return an (n, columns) block of uniform [0, 1) draws, one row per organism.
+        Each organism's row comes from the stream of its region, assigned in ascending uid order"""
+        draws = np.empty((len(uids), columns))
+        if len(uids) == 0:
+            return draws
+        regions = self.region_of(positions)
+        order = np.lexsort((uids, regions))
+        counts = np.bincount(regions, minlength=self._regions).tolist()
+        states = self.region_states(turn, purpose) if self._fast_seeding else None
+        # draw each region's rows in sorted order into one block, then scatter the block once
+        block = np.empty((len(uids), columns))
+        start = 0
+        for region, count in enumerate(counts):
+            if count:
+                if self._fast_seeding:
+                    # one reused generator, reseeded to the region's stream
+                    state, increment = states[region]
+                    self._bit_generator.state = {"bit_generator": "PCG64",
+                                                 "state": {"state": state, "inc": increment},
+                                                 "has_uint32": 0, "uinteger": 0}
+                    self._generator.random(out=block[start:start + count])
+                else:
+                    self.generator(turn, purpose, region).random(out=block[start:start + count])
+                start += count
+        draws[order] = block
+        return draws
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import numpy as np
+import settings
+import renderer
+
+format_version = 1
+# one record per organism per turn
+record_dtype = np.dtype([("x", np.int16),
+                         ("y", np.int16),
+                         ("uid", np.int64),
+                         ("health", np.float32),
+                         ("identifier", np.int8)])
+
+
+def create_run_directory(parent):
+    """Create and return a new run_<timestamp> subdirectory of parent, numbered run_<timestamp>_<n>
+    when another run started in the same second, so runs never share or overwrite a directory"""
+    base = os.path.join(parent, "run_" + time.strftime("%Y%m%d_%H%M%S"))
+    path = base
+    number = 1
+    while True:
+        try:
+            os.makedirs(path)
+            return path
+        except FileExistsError:
+            number += 1
+            path = base + "_" + str(number)
+
+
+def position_scale(world_size=settings.screen_size):
+    """Return the factor mapping world coordinates onto the int16 range"""
+    return np.iinfo(np.int16).max / (world_size / 2)
+
+
+class TrajectoryRecorder:
+    """Simulation observer that appends every turn's positions, uids, health and identifiers to a recording.
+    A recording is a directory holding header.json, records.bin with one record_dtype record per organism
+    per turn, and offsets.bin with the int64 end record index of each turn. Positions are quantized to int16
+    over the world extent. Records are appended with plain file writes, so RAM use stays flat however long
+    the run, and TrajectoryReader maps the files to read any turn directly."""
+    def __init__(self, directory, world_size=settings.screen_size):
+        self._directory = directory
+        self._world_size = world_size
+        self._scale = position_scale(world_size)
+        self._records = None
+        self._offsets = None
+        self._end = 0  # records written so far
+
+    def __call__(self, simulation):
+        turn = simulation.get_stats().get_general_stats()["turn"]
+        if self._records is None:
+            self.__open(turn)
+        self.append(simulation.get_organisms())
+
+    def append(self, organisms):
+        """Append the state of every organism as the next recorded turn"""
+        size = len(organisms)
+        records = np.empty(size, dtype=record_dtype)
+        limit = np.iinfo(np.int16).max
+        position = organisms.column("position")
+        records["x"] = np.clip(np.rint(position[:, 0] * self._scale), -limit, limit)
+        records["y"] = np.clip(np.rint(position[:, 1] * self._scale), -limit, limit)
+        records["uid"] = organisms.column("uid")
+        records["health"] = organisms.column("health")
+        records["identifier"] = organisms.column("identifier")
+        self._records.write(records.tobytes())
+        self._end += size
+        self._offsets.write(np.array([self._end], dtype=np.int64).tobytes())
+
+    def flush(self):
+        """Push buffered turns to disk, records first so every recorded offset points at written records"""
+        if self._records is not None:
+            self._records.flush()
+            self._offsets.flush()
+
+    def close(self):
+        if self._records is not None:
+            self.flush()
+            self._records.close()
+            self._offsets.close()
+            self._records = None
+            self._offsets = None
+
+    def __open(self, first_turn):
+        """Start a new recording whose first recorded turn is first_turn"""
+        os.makedirs(self._directory, exist_ok=True)
+        header = {"version": format_version,
+                  "first_turn": first_turn,
+                  "world_size": self._world_size,
+                  "scale": self._scale,
+                  "record_dtype": record_dtype.descr}
+        with open(os.path.join(self._directory, "header.json"), "w") as header_file:
+            json.dump(header, header_file)
+        self._records = open(os.path.join(self._directory, "records.bin"), "wb")
+        self._offsets = open(os.path.join(self._directory, "offsets.bin"), "wb")
+        self._end = 0
+
+
+class TrajectoryReader:
+    """Random access to a recording written by TrajectoryRecorder through memory-mapped files.
+    Only the pages of the turns actually read are loaded. Call refresh() to see turns
+    recorded after opening."""
+    def __init__(self, directory):
+        with open(os.path.join(directory, "header.json")) as header_file:
+            header = json.load(header_file)
+        if header["version"] > format_version:
+            raise ValueError("recording format version " + str(header["version"]) + " is newer than this program")
+        self._directory = directory
+        self._first_turn = header["first_turn"]
+        self._scale = header["scale"]
+        self._records = None
+        self._offsets = None
+        self.refresh()
+
+    def refresh(self):
+        """Map the files again, picking up turns recorded since"""
+        self._offsets = self.__map("offsets.bin", np.int64)
+        self._records = self.__map("records.bin", record_dtype)
+        # a turn is only complete once its records are written, even if its offset already is
+        complete = np.searchsorted(self._offsets, len(self._records), side="right")
+        self._offsets = self._offsets[:complete]
+
+    def get_first_turn(self):
+        return self._first_turn
+
+    def get_last_turn(self):
+        """Return the last recorded turn, first turn - 1 for an empty recording"""
+        return self._first_turn + len(self._offsets) - 1
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def records(self, turn):
+        """Return the raw records of the given turn, a view into the mapped file"""
+        index = turn - self._first_turn
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("turn " + str(turn) + " was not recorded")
+        start = self._offsets[index - 1] if index > 0 else 0
+        return self._records[start:self._offsets[index]]
+
+    def frame(self, turn):
+        """Return a renderer Frame of the given turn with dequantized positions"""
+        records = self.records(turn)
+        position = np.column_stack((records["x"], records["y"])) / self._scale
+        return renderer.Frame({"position": position,
+                               "uid": records["uid"],
+                               "health": records["health"],
+                               "identifier": records["identifier"]},
+                              turn)
+
+    def __map(self, name, dtype):
+        """Return the named file as a read-only memory-mapped array, empty when the file is"""
+        path = os.path.join(self._directory, name)
+        count = os.path.getsize(path) // np.dtype(dtype).itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
@@ -0,0 +1,89 @@
+import numpy as np
+import settings
+
+
+class Frame:
+    """Read-only set of organism columns captured at one turn, e.g. from shared memory or a recording.
+    Offers the len() and column() interface of Population, so renderers draw it like the live store"""
+    def __init__(self, columns, turn):
+        self._columns = columns
+        self._turn = turn
+
+    def __len__(self):
+        return len(self._columns["identifier"])
+
+    def column(self, name):
+        return self._columns[name]
+
+    def get_turn(self):
+        return self._turn
+
+
+class CanvasRenderer:
+    """Simulation observer that draws every organism as a dot on a tkinter Canvas.
+    The simulation never touches tkinter itself, so a run without a renderer is fully headless.
+    Keeps a pool of oval items, one per population row. Every frame moves all of them
+    with a single batched Tcl script of coords commands, items are only recolored when the
+    organism type in their row changes and are hidden, not deleted, when the population shrinks."""
+    def __init__(self, canvas):
+        self._canvas = canvas
+        self._path = str(canvas)  # Tcl name of the canvas widget
+
+        # center the world origin on the canvas, with y pointing up like the simulation
+        width = int(canvas.cget("width"))
+        height = int(canvas.cget("height"))
+        canvas.config(scrollregion=(-width // 2, -height // 2, width // 2, height // 2))
+
+        self._items = []  # oval item id of each pooled row
+        self._drawn = np.zeros(0, dtype=np.int8)  # identifier shown by each item, -1 when hidden
+
+    def __call__(self, simulation):
+        self.draw(simulation.get_organisms())
+
+    def draw(self, organisms):
+        """Move the pooled dots to the current organisms, growing the pool as needed"""
+        size = len(organisms)
+        if size > len(self._items):
+            self.__grow(size)
+
+        # recolor or reveal items whose row changed organism type since the last frame
+        identifier = organisms.column("identifier")
+        commands = []
+        changed = np.flatnonzero(self._drawn[:size] != identifier)
+        for row in changed:
+            color = settings.pred_color if identifier[row] == 1 else settings.prey_color
+            commands.append(self._path + " itemconfigure " + str(self._items[row]) +
+                            " -fill " + color + " -state normal")
+        self._drawn[:size] = identifier
+
+        # hide the items of rows no longer in use
+        for row in np.flatnonzero(self._drawn[size:] != -1) + size:
+            commands.append(self._path + " itemconfigure " + str(self._items[row]) + " -state hidden")
+        self._drawn[size:] = -1
+
+        # bounding boxes of every dot, canvas y points down
+        radius = settings.general["diameter"] / 2
+        position = organisms.column("position")
+        boxes = np.column_stack((position[:, 0] - radius, -position[:, 1] - radius,
+                                 position[:, 0] + radius, -position[:, 1] + radius))
+        template = self._path + " coords %d %.2f %.2f %.2f %.2f"
+        for item, box in zip(self._items, boxes.tolist()):
+            commands.append(template % (item, box[0], box[1], box[2], box[3]))
+
+        # one round trip into Tcl for the whole frame
+        if commands:
+            self._canvas.tk.eval("\n".join(commands))
+
+    def clear(self):
+        """Delete every pooled item"""
+        for item in self._items:
+            self._canvas.delete(item)
+        self._items = []
+        self._drawn = np.zeros(0, dtype=np.int8)
+
+    def __grow(self, required):
+        """Add hidden oval items until the pool holds the required number, doubling its size"""
+        count = max(required, 2 * len(self._items)) - len(self._items)
+        for item in range(count):
+            self._items.append(self._canvas.create_oval(0, 0, 0, 0, outline="", state="hidden"))
+        self._drawn = np.concatenate((self._drawn, np.full(count, -1, dtype=np.int8)))
@@ -1,14 +1,35 @@
 import math
 
-general = {"diameter": 10,  # turtle diameter
-           "speed": 10,  # animation speed
-           "slow_factor": 30,  # controls movement speed of turtles
-           "timer": int(1000 // 30),  # ontimer() turtle delay timer
+general = {"diameter": 10,  # organism dot diameter
+           "slow_factor": 30,  # movement step divisor, organisms move speed / slow_factor per turn
+           "frame_rate": 30,  # target frames per second when rendering on a frame budget
+           "render_mode": "paced",  # paced, frame_budget, every_n_turns or unlimited, see frame_scheduler.py
+           "render_every": 1,  # turns per rendered frame in every_n_turns mode
+           "unlimited_render_interval": 1.0,  # seconds between rendered frames in unlimited mode
+           "stats_rate": 4,  # statistics panel refreshes per second
+           "show_chart": True,  # live population chart in the simulation window
+           "chart_points": 2000,  # points per line of the live chart before old history is thinned
            "fast_forward": 1,  # fast-forward modifier, base 1
+           "target_speed": 6,  # paced mode: screen pixels per second an organism moves per unit of speed
+           "adaptive_step": False,  # paced mode: enlarge the movement step when turns are too slow, not reproducible
            "proximity": 10,  # proximity check in simulation steps
+           "battle_range": 5,  # organisms closer than this attack each other
+           "rng_regions": 16,  # random stream regions (vertical world strips), fixed for a given seed
+           "autosave_turns": 5000,  # autosave every this many turns, 0 disables
+           "autosave_seconds": 600,  # autosave every this many seconds, 0 disables
+           "autosave_keep": 3,  # newest autosaves of a session kept, 0 keeps all
+           "autosave_directory": "autosaves",  # relative to the working directory, one subdirectory per session
+           "record_trajectories": False,  # record every turn of the simulation window for replays
+           "recording_directory": "recordings",  # each recorded run gets its own subdirectory
+           "series_capacity": 100000,  # turns of per-turn statistics kept in memory
+           "series_spill": False,  # append older per-turn statistics to disk instead of dropping them
+           "series_directory": "series",  # spill files, relative to the working directory
+           "trait_bins": 20,  # histogram bins per trait and species
+           "profile_window": 100,  # turns kept by the hot-path profiler
+           "show_profile": False,  # show profiler timings in the stats frame
            }
 
-# turtle screen
+# simulation screen
 screen_size = 600
 
 # tkinter frame parameters
@@ -95,7 +116,7 @@ tooltip = {"prey_main": "Enter starting values for PREY.",
                                  "Improves the chance of genome mutations.\n"
                                  "May be any value > 0.",
            "start_button": "Start the simulation with the current parameters.",
-           "load_button": "Load a saved simulation from a save (.pkl) file.",
+           "load_button": "Load a saved simulation from a checkpoint (.npz) file.",
            "sim_screen": "Predators are RED dots.\nPrey are GREEN dots.",
            "stats_frame": "Live statistics of the simulation.\n\n"
                           "Population: current population of the organisms. Also broken\n"
@@ -103,6 +124,10 @@ tooltip = {"prey_main": "Enter starting values for PREY.",
                           "Turn Number: current turn of the simulation. A turn consists of\n"
                           "setting destination, moving, fighting, and reproducing.\n\n"
                           "Time Elapsed: time since the simulation began.\n\n"
+                          "Seed: random seed of the session. Runs started with the same\n"
+                          "seed and parameters are identical.\n\n"
+                          "Turns/Second: simulation turns run per second.\n\n"
+                          "ms/Turn: mean time to compute one turn.\n\n"
                           "Generation: current youngest generation. Initial 0. Each time a\n"
                           "child is born, their generation is 1 higher than the parent.\n\n"
                           "Births: number of births, broken down by organism type, since\n"
@@ -110,9 +135,17 @@ tooltip = {"prey_main": "Enter starting values for PREY.",
                           "Deaths: number of deaths, broken down by organism type, since\n"
                           "the simulation began.",
            "fast_forward": "Fast-forward the simulation by up to 10x.",
+           "render_mode": "How often the screen is redrawn.\n\n"
+                          "Paced: keep organisms moving at a steady on-screen speed.\n"
+                          "30 FPS: run as many turns as fit in each frame.\n"
+                          "Every N turns: redraw after a fixed number of turns.\n"
+                          "Unlimited: run at full speed, redraw about once per second.",
            "pause_button": "Pause or unpause the simulation.",
-           "save_button": "Save the current state of the simulation.\nSimulation paused during save.",
+           "save_button": "Save the current state of the simulation.",
            "stop_button": "Stop the simulation and return to parameters window.",
+           "replay_button": "Replay a recorded run from its recording directory.",
+           "replay_speed": "Recorded turns advanced per frame while playing.",
+           "replay_seek": "Drag to jump to any recorded turn.",
            "graph_checkbox": "Shows population and mutation graphs when stop button is pressed.",
            }
 
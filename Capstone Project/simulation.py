@@ -0,0 +1,169 @@
+import numpy as np
+import settings
+import lineage
+import population
+import profiler
+import random_streams
+import spatial_grid
+import simulation_steps
+import statistics
+import speed_control
+
+
+def create_organisms(organisms, identifier, position, destination, traits, mutation, session_stats, parents=None):
+    """Stage new organisms with the given parameters in the organisms Population store.
+    They join the population at the end of the current turn. parents holds the uid of each
+    offspring's parent, None for founders."""
+    nursery, start, stop = organisms.stage(identifier, position, destination, traits, mutation)
+    identifier = nursery.column("identifier")[start:stop]
+    session_stats.add_organisms(identifier)
+
+    # log the births, offspring are born during the running turn, which is one past the last finished
+    turn = session_stats.get_general_stats()["turn"]
+    session_stats.get_lineage().record_births(nursery.column("uid")[start:stop],
+                                              -1 if parents is None else parents,
+                                              turn if parents is None else turn + 1,
+                                              identifier,
+                                              nursery.column("generation")[start:stop],
+                                              {name: nursery.column(name)[start:stop]
+                                               for name in lineage.trait_fields})
+
+    # increment generation statistics as needed
+    generation = nursery.column("generation")[start:stop]
+    for kind in (0, 1):
+        born = generation[identifier == kind]
+        if len(born) and born.max() > session_stats.get_generation(kind):
+            session_stats.set_generation(kind, int(born.max()))
+
+
+def rand_coords(uniform):
+    """Returns an (n, 2) array of random [x, y] coordinates from (n, 2) uniform [0, 1) draws"""
+    return (uniform - 0.5) * settings.screen_size
+
+
+def initialize_organisms(organisms, prey_attributes, pred_attributes, session_stats, streams):
+    """Generate starting organisms for prey and predators"""
+    # predators first, then prey
+    identifier = np.repeat([1, 0], [pred_attributes["population"], prey_attributes["population"]])
+    draws = streams.generator(0, random_streams.PLACEMENT).random((len(identifier), 8))
+    traits = {}
+    for name in population.genome_fields:
+        traits[name] = np.where(identifier == 1, pred_attributes[name], prey_attributes[name])
+
+    create_organisms(organisms,
+                     identifier,
+                     rand_coords(draws[:, 0:2]),
+                     rand_coords(draws[:, 2:4]),
+                     traits,
+                     draws[:, 4:8] * 2 - 1,
+                     session_stats)
+    organisms.end_turn()  # merge the staged starting population
+
+
+class Simulation:
+    """Headless simulation engine. Owns the organisms, the session statistics and the speed factors,
+    and advances the world one turn at a time without any dependency on tkinter.
+    Rendering is attached as an optional observer."""
+    def __init__(self, prey_attributes, pred_attributes, save_data=None, seed=None):
+        # start a new session, random when no seed is given
+        if save_data is None:
+            self._streams = random_streams.RandomStreams(seed)
+            self._organisms = population.Population()
+            self._session_stats = statistics.Statistics(pred_attributes, prey_attributes, self._streams.get_seed())
+            initialize_organisms(self._organisms, prey_attributes, pred_attributes, self._session_stats,
+                                 self._streams)
+        # otherwise resume a saved session with its recorded seed
+        else:
+            self._organisms = save_data[0]
+            self._session_stats = save_data[1]
+            self._session_stats.reset_start_time()  # reset stopwatch
+            self._streams = random_streams.RandomStreams(self._session_stats.get_general_stats()["seed"])
+
+        self._speed_factors = speed_control.SpeedControl(settings.general)
+        self._grid = spatial_grid.SpatialGrid(settings.screen_size)
+        self._profiler = profiler.Profiler()
+        self._observers = []
+        self._session_stats.measure_traits(self._organisms)
+
+    def get_organisms(self):
+        return self._organisms
+
+    def get_stats(self):
+        return self._session_stats
+
+    def get_speed_factors(self):
+        return self._speed_factors
+
+    def get_seed(self):
+        return self._streams.get_seed()
+
+    def get_profiler(self):
+        return self._profiler
+
+    def add_observer(self, observer):
+        """Register a callable that receives this Simulation after every turn, e.g. a renderer"""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        """Unregister a previously added observer"""
+        self._observers.remove(observer)
+
+    def step(self, n=1):
+        """Run n full turns, notifying observers after each one"""
+        for turn in range(n):
+            # close the previous turn's profile, including any drawing done after it
+            self._profiler.next_turn()
+            self.__turn()
+            start = self._profiler.start()
+            for observer in self._observers:
+                observer(self)
+            self._profiler.stop("observers", start)
+
+    def __turn(self):
+        """Run the turn steps for each organism"""
+        organisms = self._organisms
+
+        # steps 1 to 3
+        self._interact()
+
+        # step 4
+        start = self._profiler.start()
+        simulation_steps.conclude_turn(organisms, self._session_stats, self._streams)
+        self._profiler.stop("conclude_turn", start)
+        self._profiler.count("births", organisms.get_staged())
+        self._profiler.count("deaths", organisms.get_dead())
+
+        # drop the dead and merge the newborn in one pass each
+        organisms.end_turn()
+        self._session_stats.measure_traits(organisms)
+        self._session_stats.next_turn()
+
+    def _interact(self):
+        """Run steps 1 to 3 of the turn: set targets, move and battle.
+        Each step runs for every organism before the next step starts,
+        so row indices stay valid for the spatial grid until step 4"""
+        organisms = self._organisms
+        turn = self._session_stats.get_general_stats()["turn"]
+        profile = self._profiler
+
+        # step 1
+        start = profile.start()
+        self._grid.build(organisms.column("position"),
+                         spatial_grid.cell_size_for(organisms, settings.general["battle_range"]))
+        simulation_steps.set_target(organisms, self._grid, self._streams, turn)
+        profile.stop("set_target", start)
+        profile.count("candidates", self._grid.get_candidates())
+
+        # step 2
+        start = profile.start()
+        simulation_steps.move(organisms, self._speed_factors)
+        profile.stop("move", start)
+
+        # step 3
+        # organisms moved, re-bucket them into battle range sized cells before looking for contacts
+        start = profile.start()
+        self._grid.build(organisms.column("position"), settings.general["battle_range"])
+        contacts = simulation_steps.battle(organisms, self._grid)
+        profile.stop("battle", start)
+        profile.count("candidates", self._grid.get_candidates())
+        profile.count("contacts", contacts)
@@ -1,58 +1,173 @@
+import numpy as np
 import settings
-import simulation_window
-
-
-def set_target(index, organisms, speed_factors):
-    """Step 1 of turn order.
-    Check proximity and set new destination when old destination reached."""
-    # check if within range of target
-    if organisms[index].proximity_check(settings.general["proximity"]):
-        organisms[index].set_dest(organisms, speed_factors.get_fast_forward())
-
-
-def move(index, organisms, speed_factors):
-    """Step 2 of turn order.
-    Animate movement of the Organism at the given index."""
-    # update position, clear shape, move turtle, and redraw shape at new location
-    organisms[index].update_pos(settings.screen_size, speed_factors.get_slow_factor())
-    organisms[index].clear()
-    organisms[index].move()
-    organisms[index].draw_dot(settings.general["diameter"])
-
-
-def battle(index, organisms, speed_factors):
-    """Step 3 of turn order.
-    Organisms battle each other according to battle method."""
-    organisms[index].battle(organisms, speed_factors.get_fast_forward())
-
-
-def conclude_turn(index, organisms, session_stats, screen, speed_factors):
-    """Step 4 of turn order.
-    Clear dead organisms and reproduce."""
-    organisms[index].increment_age(speed_factors.get_fast_forward())
-    # remove an organism from the board if it reaches 0 health
-    if organisms[index].is_dead():
-        # clear organism animation and remove from list
-        organisms[index].clear()
-        session_stats.remove_organism(organisms[index].get_attributes())
-        organisms.pop(index)
-        return False
-    # otherwise reproduce offspring when fertile
-    else:
-        if organisms[index].is_fertile(speed_factors.get_fast_forward(), session_stats.get_prey_pop()):
-            identifier = organisms[index].get_identifier()
-            pos = organisms[index].get_offspring_pos()
-            dest = simulation_window.rand_coords()
-            simulation_window.create_organism(organisms,
-                                              screen,
-                                              identifier,
-                                              pos,
-                                              dest,
-                                              organisms[index].get_attributes(), session_stats)
-
-            # increment generation statistics as needed
-            child_gen = organisms[len(organisms) - 1].get_generation()
-            if child_gen > session_stats.get_generation(identifier):
-                session_stats.set_generation(identifier, child_gen)
-
-        return True
+import simulation
+import population
+import random_streams
+import steering
+
+
+def set_target(organisms, grid, streams, turn, owned=None):
+    """Step 1 of turn order, batched over the whole population.
+    Check proximity and set new destination when old destination reached.
+    If an owned boolean mask is given, only those rows are updated, the others only act as neighbors."""
+    position = organisms.column("position")
+    destination = organisms.column("destination")
+    direction = organisms.column("direction")
+
+    # rows within range of their target
+    remaining = destination - position
+    arrived = np.hypot(remaining[:, 0], remaining[:, 1]) < settings.general["proximity"]
+    if owned is not None:
+        arrived &= owned
+    rows = np.flatnonzero(arrived)
+    if len(rows) == 0:
+        return
+
+    # resultant behavior vector of every row from all of its visible neighbors at once
+    i, j, offset, distance = steering.visible_pairs(organisms, grid, rows, organisms.column("vision")[rows])
+    vector = steering.steer(organisms, i, j, offset, distance)[rows]
+
+    # rows without neighbors wander to a random point within their visual field
+    alone = np.ones(len(organisms), dtype=bool)
+    alone[i] = False
+    wander = rows[alone[rows]]
+    if len(wander):
+        peripheral = organisms.column("peripheral")[wander]
+        vision = organisms.column("vision")[wander]
+        draws = streams.random(turn, random_streams.WANDER, position[wander], organisms.column("uid")[wander])
+        direction[wander] = direction[wander] - peripheral + draws[:, 0] * 2 * peripheral
+        vector[alone[rows]] = np.column_stack((np.cos(direction[wander]) * vision,
+                                               np.sin(direction[wander]) * vision))
+
+    # set new destination and update direction
+    destination[rows] = position[rows] + vector
+    direction[rows] = np.arctan2(vector[:, 1], vector[:, 0])
+
+
+def move(organisms, speed_factors):
+    """Step 2 of turn order, batched over the whole population.
+    Increment every position towards its destination."""
+    position = organisms.column("position")
+    destination = organisms.column("destination")
+    direction = organisms.column("direction")
+
+    # slow_factor reduces distance moved and makes the animation smoother
+    step = organisms.column("speed") / speed_factors.get_slow_factor()
+    position[:, 0] += step * np.cos(direction)
+    position[:, 1] += step * np.sin(direction)
+
+    # prevent organisms from going off-screen (only applicable at very high speeds)
+    half = settings.screen_size / 2
+    for axis in (0, 1):
+        over = position[:, axis] > half
+        under = position[:, axis] < -half
+        position[over, axis] = np.mod(position[over, axis], -half)
+        destination[over, axis] = np.mod(destination[over, axis], -half)
+        position[under, axis] = np.mod(position[under, axis], settings.screen_size) / 2
+        destination[under, axis] = np.mod(destination[under, axis], settings.screen_size) / 2
+
+
+def battle(organisms, grid, owned=None):
+    """Step 3 of turn order, batched over the whole population.
+    Every organism attacks the neighbors of the opposing type within battle range and visual field,
+    reducing their health by its damage value. Predators gain energy from each attack until full.
+    All contacts are found first and applied together, so the outcome does not depend on row order.
+    Returns the number of contacts, only counting those of owned attackers if an owned boolean mask is given."""
+    if len(organisms) == 0:
+        return 0
+    rows = np.arange(len(organisms))
+    radius = np.full(len(organisms), float(settings.general["battle_range"]))
+    i, j, offset, distance = steering.visible_pairs(organisms, grid, rows, radius)
+
+    # only predator-prey contacts fight
+    identifier = organisms.column("identifier")
+    contact = identifier[i] != identifier[j]
+    i = i[contact]
+    j = j[contact]
+
+    health = organisms.column("health")
+    energy = organisms.column("energy")
+    damage = organisms.column("damage")
+
+    # predators gain energy per attack while their energy is below their health
+    attacks = np.bincount(i, minlength=len(organisms))
+    hungry = (identifier == 1) & (attacks > 0) & (energy < health)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        until_full = np.where(damage > 0, np.ceil((health - energy) / damage), attacks)
+    feeds = np.where(hungry, np.minimum(attacks, until_full), 0)
+    energy += feeds * damage
+
+    # scatter-add the damage of every attacker onto its target, kept until conclude_turn counts the kills
+    damage_taken = organisms.column("damage_taken")
+    damage_taken[:] = np.bincount(j, weights=damage[i], minlength=len(organisms))
+    health -= damage_taken
+    if owned is not None:
+        return int(np.count_nonzero(owned[i]))
+    return len(i)
+
+
+def conclude_turn(organisms, session_stats, streams):
+    """Step 4 of turn order, batched over the whole population.
+    Age organisms, clear dead organisms and reproduce.
+    Dead organisms are only tombstoned and offspring only staged, Population.end_turn()
+    compacts and merges them once the turn is over."""
+    if len(organisms) == 0:
+        return
+    turn = session_stats.get_general_stats()["turn"]
+    position = organisms.column("position")
+    identifier = organisms.column("identifier")
+    health = organisms.column("health")
+    energy = organisms.column("energy")
+    damage = organisms.column("damage")
+    birth_rate = organisms.column("birth_rate")
+    age = organisms.column("age")
+
+    # column 0 rolls starvation, column 1 rolls fertility
+    draws = streams.random(turn, random_streams.CONCLUDE, position, organisms.column("uid"), 2)
+
+    # increment age, predators without energy starve
+    age += 0.01
+    starving = (identifier == 1) & (energy == 0)
+    health[starving] -= draws[starving, 0] * 0.1  # simulated starvation
+
+    # tombstone organisms that reached 0 health or died of old age,
+    # renderers clear their sprites on the next update
+    dead = (organisms.column("lifespan") < age) | (health <= 0)
+    # killed in battle by the other type, also when starvation dealt the last blow
+    killed = (health <= 0) & (organisms.column("damage_taken") > 0)
+    session_stats.add_kills(1, int(np.count_nonzero(killed & (identifier == 0))))
+    session_stats.add_kills(0, int(np.count_nonzero(killed & (identifier == 1))))
+    session_stats.remove_organisms(identifier[dead])
+    session_stats.get_lineage().record_deaths(organisms.column("uid")[dead], turn + 1)
+    organisms.kill(np.flatnonzero(dead))
+
+    # otherwise reproduce offspring when fertile (probability based on birth rate)
+    fertile_pred = ~dead & (identifier == 1) & (draws[:, 1] < birth_rate) & (energy > damage)
+    energy[fertile_pred] -= damage[fertile_pred]
+    fertile = fertile_pred
+    prey_population = session_stats.get_prey_pop()
+    if prey_population > 0:
+        fertile_prey = ~dead & (identifier == 0) & (draws[:, 1] < birth_rate / (prey_population / 100))
+        fertile = fertile | fertile_prey
+
+    parents = np.flatnonzero(fertile)
+    if len(parents) == 0:
+        return
+
+    # columns 0-1 offset the offspring from its parent, 2-3 pick its destination, 4-7 mutate its genome
+    draws = streams.random(turn, random_streams.BIRTH, position[parents], organisms.column("uid")[parents], 8)
+    offspring_pos = np.column_stack((position[parents, 0] + draws[:, 0] * 20 - 10,
+                                     position[parents, 0] + draws[:, 1] * 20 - 10))
+    traits = {}
+    for name in population.genome_fields:
+        traits[name] = organisms.column(name)[parents]
+    traits["generation"] = traits["generation"] + 1  # offspring's generation is always + 1
+
+    simulation.create_organisms(organisms,
+                                identifier[parents],
+                                offspring_pos,
+                                simulation.rand_coords(draws[:, 2:4]),
+                                traits,
+                                draws[:, 4:8] * 2 - 1,
+                                session_stats,
+                                organisms.column("uid")[parents])
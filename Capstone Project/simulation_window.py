@@ -1,90 +1,33 @@
 import parameters_window
 import settings
-import organism
-import simulation_steps
-import statistics
-import speed_control
-import turtle
-import random
+import engine_process
+import profiler
+import renderer
+import live_chart
+import frame_scheduler
 import tkinter
 import tkinter.filedialog as filemanager
 import os
-import pickle
+import time
+import zipfile
+import checkpoint
+import recorder
+import numpy as np
 import tktooltip
 
-interrupt = False
 pause_simulation = False
 show_results = True
 
 
-def create_organism(organisms, screen, identifier, position, destination, attributes, session_stats):
-    """Create a new Organism class object with the given parameters and add it to organisms list"""
-    organisms.append(organism.Organism(screen, identifier, position, destination, attributes))
-
-    index = len(organisms) - 1
-
-    session_stats.add_organism(organisms[index].get_attributes())
-    organisms[index].init_sprite(settings.general["speed"], settings.general["diameter"])
-
-
-def rand_coords():
-    """Returns a list containing random [x, y] coordinates"""
-    return [random.uniform(-settings.screen_size/2, settings.screen_size/2),
-            random.uniform(-settings.screen_size/2, settings.screen_size/2)]
-
-
-def initialize_organisms(organisms, screen, prey_attributes, pred_attributes, session_stats):
-    """Generate starting Organism objects for prey and predators"""
-    # generate initial predator population
-    for i in range(pred_attributes["population"]):
-        create_organism(organisms, screen, 1, rand_coords(), rand_coords(), pred_attributes, session_stats)
-
-    # initial prey population
-    for i in range(prey_attributes["population"]):
-        create_organism(organisms, screen, 0, rand_coords(), rand_coords(), prey_attributes, session_stats)
-
-
-def initialize_organisms_from_save(organisms, sim_screen):
-    """Load Organisms from a saved list"""
-    for organism_object in organisms:
-        organism_object.init_sprite(settings.general["speed"], settings.general["diameter"], sim_screen)
-
-
-def steps(organisms, session_stats, screen, speed_factors):
-    """Run the turn steps for each organism"""
-    # auto-update slow_factor
-    speed_factors.auto_adjust(session_stats.get_pred_stats()["population"] +
-                              session_stats.get_prey_stats()["population"])
-
-    # run all steps for each organism in the list
-    i = 0
-    while i < len(organisms):
-
-        # step 1
-        simulation_steps.set_target(i, organisms, speed_factors)
-
-        # step 2
-        simulation_steps.move(i, organisms, speed_factors)
-
-        # step 3
-        simulation_steps.battle(i, organisms, speed_factors)
-
-        # step 4
-        if simulation_steps.conclude_turn(i, organisms, session_stats, screen, speed_factors):  # if organism hasn't died
-            i += 1
-    session_stats.next_turn()
-
-
 def plus_one(one_element_list):
     """Add one to the first element in the list. Great for lazy programmers :-)"""
     one_element_list[0] += 1
     return one_element_list[0]
 
 
-def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save_data=None):
+def change_to_simulation(root, prey_attributes, pred_attributes, save_data=None):
     """Build simulation screen and run the simulation"""
-    global interrupt, pause_simulation, show_results
-    interrupt = False
+    global pause_simulation
     pause_simulation = False
     current_row = [0]
 
@@ -92,16 +35,16 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     for child in root.winfo_children():
         child.destroy()
 
-    # track new session statistics
-    if save_data is None:
-        session_stats = statistics.Statistics(pred_attributes, prey_attributes)
-    # otherwise load saved session statistics
-    else:
-        session_stats = save_data[1]
-        session_stats.reset_start_time()  # reset stopwatch
-
-    # track speed factors
-    speed_factors = speed_control.SpeedControl(settings.general)
+    # headless engine runs in its own process and owns organisms, session statistics and speed factors
+    # a new session is started unless save data is given
+    try:
+        engine = engine_process.EngineProcess(prey_attributes, pred_attributes, save_data)
+    except engine_process.EngineError as error:
+        parameters_window.change_to_parameters(root, settings.prey_attributes, settings.pred_attributes)
+        parameters_window.popup(root, str(error))
+        return
+    session_stats = engine.get_stats()  # latest statistics snapshot of the engine
+    view_profile = profiler.Profiler()  # drawing times, one entry per frame
 
     # -----------------------------------------------------------------------------
     # HELP menu
@@ -130,28 +73,41 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
         parameters_window.popup(root, "Welcome to A-Life Challenge Help!\n\n"
                                       "SIMULATION SPEED\n"
                                       "To increase simulation speed, move slider to\n"
-                                      "the right. Note: this feature emulates increased\n"
-                                      "speeds, but may not result in the same outcome.\n\n"
+                                      "the right. Up to 10 times as many turns run per\n"
+                                      "frame, with the same outcome as normal speed.\n\n"
+                                      "RENDER MODE\n"
+                                      "Choose how often the screen is redrawn. Drawing\n"
+                                      "less often lets the simulation run faster.\n\n"
                                       "PAUSE\n"
                                       "Press the pause button to pause/unpause the\n"
                                       "simulation.\n\n"
                                       "SAVE\n"
                                       "To save the current state of the simulation, press\n"
-                                      "the save button. The simulation will pause while\n"
-                                      "the save file is being created.\n\n"
+                                      "the save button. The simulation keeps running\n"
+                                      "while the save file is being created.\n\n"
                                       "LOAD\n"
                                       "Loads a new simulation from save file. The current\n"
-                                      "simulation will not be saved. Simulation paused until\n"
-                                      "a file is loaded.\n\n"
+                                      "simulation will not be saved.\n\n"
                                       "GRAPH RESULTS\n"
                                       "To view plots of the organism population and mutations\n"
                                       "over time, check the \"Show graph results\" box.")
 
+    def save_profile():
+        """Dump the hot-path timers and counters of the recent turns to a JSON file"""
+        file_name = filemanager.asksaveasfilename(initialfile='a_life_profile',
+                                                  initialdir=os.getcwd(),
+                                                  filetypes=[('JSON File', '*.json')],
+                                                  defaultextension='.json')
+        if file_name:
+            engine.send("profile", file_name)
+
     # ------------------------------
     # help label
     # ------------------------------
     help_menu.add_command(label="General Help", command=show_general_help)
     help_menu.add_command(label="Button Help", command=show_button_help)
+    help_menu.add_separator()
+    help_menu.add_command(label="Save Profile...", command=save_profile)
     menu.add_cascade(menu=help_menu, label="Help")
 
     # -----------------------------------------------------------------------------
@@ -168,7 +124,7 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     # -------------------------------
     def update_speed(num):
         """Update the simulation speed to reflect slider value"""
-        speed_factors.set_fast_forward(int(num))
+        engine.send("speed", int(num))
         print("Speed set to: " + num + ".")
 
     # speed slider
@@ -181,11 +137,36 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
                                  orient="horizontal",
                                  length=200,  # horizontal length of slider in pixels
                                  width=15)  # slider height in pixels
-    speed_slider.pack(side="left", padx=(10, 100))
+    speed_slider.pack(side="left", padx=(10, 20))
     tktooltip.ToolTip(speed_slider,
                       msg=settings.tooltip["fast_forward"],
                       delay=settings.delay_long)
 
+    # -------------------------------
+    # render mode menu
+    # -------------------------------
+    def update_render_mode(choice):
+        """Switch the frame scheduler of the engine to the selected render mode"""
+        mode, render_every = frame_scheduler.choices[choice]
+        engine.send("render_mode", mode, render_every)
+
+    # select the choice matching the render settings the engine started with
+    render_mode_var = tkinter.StringVar(value=list(frame_scheduler.choices)[0])
+    for label, (mode, render_every) in frame_scheduler.choices.items():
+        if mode == settings.general["render_mode"] and (mode != frame_scheduler.EVERY_N_TURNS or
+                                                        render_every == settings.general["render_every"]):
+            render_mode_var.set(label)
+            break
+    render_mode_menu = tkinter.OptionMenu(button_frame,
+                                          render_mode_var,
+                                          *frame_scheduler.choices,
+                                          command=update_render_mode)
+    render_mode_menu.config(width=12)
+    render_mode_menu.pack(side="left", padx=(0, 40))
+    tktooltip.ToolTip(render_mode_menu,
+                      msg=settings.tooltip["render_mode"],
+                      delay=settings.delay_long)
+
     # -------------------------------
     # pause button
     # -------------------------------
@@ -193,17 +174,17 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
         """Pause simulation"""
         global pause_simulation
 
-        # toggle pause
+        # toggle pause, the engine restarts its stopwatch when resumed
         if not pause_simulation:
             pause_simulation = True
         else:
             pause_simulation = False
+        engine.send("pause", pause_simulation)
 
         # toggle button text
         if pause_text.get() == "Pause":
             pause_text.set("Resume")
         else:
-            session_stats.reset_start_time()  # restart stopwatch from current time
             pause_text.set("Pause")
 
     # create pause button in button frame
@@ -228,30 +209,11 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
         # returns empty string on cancel
         file_name = filemanager.asksaveasfilename(initialfile='a_life_save',
                                                   initialdir=os.getcwd(),
-                                                  filetypes=[('Pickle File', '*.pkl')],
-                                                  defaultextension='.pkl')
-        # open the file and pickle the data IF user selected a file name
+                                                  filetypes=[('Checkpoint File', '*' + checkpoint.extension)],
+                                                  defaultextension=checkpoint.extension)
+        # the engine checkpoints its current organisms and statistics IF user selected a file name
         if file_name:
-            # temporarily clear turtle sprites from Organism objects to prep for pickling
-            # can't use copy.deepcopy here since it also employs pickle
-            for organism_object in organisms:
-                organism_object.clear()
-                organism_object.delete_sprite()
-
-            # save current organisms and statistics
-            pickle_data = [organisms, session_stats]
-
-            # 'with' automatically error checks and closes file after nested code
-            with open(file_name, 'wb') as save_file:
-                pickle.dump(pickle_data, save_file, pickle.HIGHEST_PROTOCOL)
-
-            # reinitialize sprites
-            for organism_object in organisms:
-                organism_object.init_sprite(settings.general["speed"],
-                                            settings.general["diameter"],
-                                            sim_screen)
-
-        session_stats.reset_start_time()  # restart stopwatch from current time
+            engine.send("save", file_name)
 
     # create save button
     save_button = tkinter.Button(button_frame,
@@ -269,44 +231,31 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     # -------------------------------
     def load():
         """Load simulation from save file"""
-        global interrupt
-
         # get file to load
         file_name = filemanager.askopenfilename(initialfile='a_life_save',
                                                 initialdir=os.getcwd(),
-                                                filetypes=[('Pickle File', '*.pkl')],
-                                                defaultextension='.pkl')
+                                                filetypes=[('Checkpoint File', '*' + checkpoint.extension)],
+                                                defaultextension=checkpoint.extension)
         # if file selected, load data and restart simulation
         if file_name:
-            with open(file_name, 'rb') as load_file:
-                try:
-                    pickle_data = pickle.load(load_file)
-                except (pickle.UnpicklingError, AttributeError, EOFError, IndexError):
-                    parameters_window.popup(root, "Bad file. Please try again.")
-                    return
-                except ImportError:
-                    parameters_window.popup(root, "Error importing module associated with file."
-                                                  "\n\nPlease try again.")
-                    return
-                except Exception:
-                    parameters_window.popup(root, "Unknown error occurred. Please try again.")
-                    return
-
-            # stop running simulation steps and reset variables
-            interrupt = True
-            sim_screen.resetscreen()
-            organisms.clear()
+            try:
+                save_data = checkpoint.load(file_name)
+            except (ValueError, KeyError, OSError, zipfile.BadZipFile):
+                parameters_window.popup(root, "Bad file. Please try again.")
+                return
+            except Exception:
+                parameters_window.popup(root, "Unknown error occurred. Please try again.")
+                return
+
+            # stop the running engine
+            engine.stop()
+            sim_renderer.clear()
 
             # restart simulation window
             change_to_simulation(root,
-                                 organisms,
                                  settings.prey_attributes,
                                  settings.pred_attributes,
-                                 pickle_data)
-
-        # load aborted, restart stopwatch from current time
-        else:
-            session_stats.reset_start_time()
+                                 save_data)
 
     # add load button to button frame
     load_button = tkinter.Button(button_frame,
@@ -323,22 +272,19 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     # stop button
     # -------------------------------
     def quit_simulation():
-        """Stop turtle animation and simulation turns, then switch to parameters window"""
-        global interrupt, show_results
-
-        # stop running simulation steps and reset variables
-        # may need to check interrupt in each turn step (if steps are executed after next line of code, returns errors)
-        interrupt = True
-        sim_screen.resetscreen()  # DO NOT USE bye() - cannot restart turtle graphics after bye()
-        organisms.clear()
-        if show_results:
-            session_stats.log_population()
+        """Stop animation and simulation turns, then switch to parameters window"""
+        # stop the engine process, it hands back its final statistics unless it had died
+        final_stats = engine.stop()
+        sim_renderer.clear()
+        if show_results and final_stats is not None:
+            final_stats.log_population()
 
         # swap back to parameters window
         parameters_window.change_to_parameters(root,
-                                               organisms,
                                                settings.prey_attributes,
                                                settings.pred_attributes)
+        for error in engine.pop_errors():
+            parameters_window.popup(root, error)
 
     # add stop button to button frame
     stop_button = tkinter.Button(button_frame,
@@ -394,19 +340,12 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
                                 highlightthickness=1)
     sim_canvas.pack(side="left", anchor="ne", padx=settings.x_pad//4, pady=settings.y_pad//3)
 
-    # setup turtle screen
-    sim_screen = turtle.TurtleScreen(sim_canvas)
-    sim_screen.tracer(0, 0)  # requires update method to be called on screen
     tktooltip.ToolTip(sim_canvas,
                       msg=settings.tooltip["sim_screen"],
                       delay=settings.delay_short)
 
-    # initialize list of organisms - must happen before stats frame is populated
-    if save_data is None:
-        initialize_organisms(organisms, sim_screen, prey_attributes, pred_attributes, session_stats)
-    else:
-        organisms = save_data[0]
-        initialize_organisms_from_save(organisms, sim_screen)
+    # draw the latest frame published by the engine as canvas dots
+    sim_renderer = renderer.CanvasRenderer(sim_canvas)
 
     # -----------------------------------------------------------------------------
     # live stats frame
@@ -423,9 +362,9 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     # -------------------------------
     # get starting statistics
     # -------------------------------
-    pred_stats = session_stats.get_pred_stats()
-    prey_stats = session_stats.get_prey_stats()
-    general_stats = session_stats.get_general_stats()
+    pred_stats = session_stats["pred"]
+    prey_stats = session_stats["prey"]
+    general_stats = session_stats["general"]
 
     # -------------------------------
     # window title
@@ -470,10 +409,42 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     elapsed_time_label.grid(row=plus_one(current_row), column=0, sticky="w")
 
     # display time using Statistics class method
-    elapsed_time_text = tkinter.StringVar(value=session_stats.get_time_str())
+    elapsed_time_text = tkinter.StringVar(value=session_stats["time"])
     elapsed_time = tkinter.Label(side_frame, textvariable=elapsed_time_text)
     elapsed_time.grid(row=current_row[0], column=1, sticky="w")
 
+    # -------------------------------
+    # seed
+    # -------------------------------
+    # label
+    seed_label = tkinter.Label(side_frame, text="Seed:")
+    seed_label.grid(row=plus_one(current_row), column=0, sticky="w")
+
+    # seed never changes during a session, no StringVar needed
+    seed = tkinter.Label(side_frame, text=str(general_stats["seed"]))
+    seed.grid(row=current_row[0], column=1, sticky="w")
+
+    # -------------------------------
+    # throughput
+    # -------------------------------
+    # turns per second label
+    turn_rate_label = tkinter.Label(side_frame, text="Turns/Second:")
+    turn_rate_label.grid(row=plus_one(current_row), column=0, sticky="w")
+
+    # show turns per second measured by the engine
+    turn_rate_text = tkinter.StringVar(value=format(session_stats["turns_per_second"], ".1f"))
+    turn_rate = tkinter.Label(side_frame, textvariable=turn_rate_text)
+    turn_rate.grid(row=current_row[0], column=1, sticky="w")
+
+    # ms per turn label
+    turn_time_label = tkinter.Label(side_frame, text="ms/Turn:")
+    turn_time_label.grid(row=plus_one(current_row), column=0, sticky="w")
+
+    # show mean compute time of a turn over the profiler window
+    turn_time_text = tkinter.StringVar(value=format(session_stats["seconds_per_turn"] * 1000, ".2f"))
+    turn_time = tkinter.Label(side_frame, textvariable=turn_time_text)
+    turn_time.grid(row=current_row[0], column=1, sticky="w")
+
     # -------------------------------
     # prey label
     # -------------------------------
@@ -584,6 +555,28 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     pred_deaths = tkinter.Label(side_frame, textvariable=pred_deaths_text)
     pred_deaths.grid(row=current_row[0], column=1, sticky="w")
 
+    # -------------------------------
+    # profiler timings (optional)
+    # -------------------------------
+    profile_text = tkinter.StringVar(value="")
+    if settings.general["show_profile"]:
+        # profile label
+        profile_label = tkinter.Label(side_frame, text="Profile (ms/turn)", font='Calibri 11 underline')
+        profile_label.grid(row=plus_one(current_row), column=0, sticky="w", pady=settings.y_pad_top)
+
+        # show mean timings over the profiler window, one line per timer
+        profile_values = tkinter.Label(side_frame, textvariable=profile_text, justify="left")
+        profile_values.grid(row=plus_one(current_row), column=0, columnspan=2, sticky="w")
+
+    # -------------------------------
+    # live population chart (optional)
+    # -------------------------------
+    population_chart = None
+    if settings.general["show_chart"]:
+        population_chart = live_chart.LiveChart(side_frame)
+        population_chart.get_widget().grid(row=plus_one(current_row), column=0, columnspan=2, sticky="w",
+                                           pady=settings.y_pad_top)
+
     # -------------------------------
     # blank row
     # -------------------------------
@@ -591,48 +584,299 @@ def change_to_simulation(root, organisms, prey_attributes, pred_attributes, save
     blank_row_label = tkinter.Label(side_frame, text="")
     blank_row_label.grid(row=plus_one(current_row), column=1, sticky="w", padx=settings.x_pad_right_super)
 
-    def update_stats_frame(stats_object):
-        """Update the values in the statistics frame"""
-        cur_pred_stats = stats_object.get_pred_stats()
-        cur_prey_stats = stats_object.get_prey_stats()
-        cur_general_stats = stats_object.get_general_stats()
+    # text last shown by each value label, by variable name
+    shown = {}
+
+    def show(text_var, value):
+        """Set the text of a value label only when it changed, so Tk does not relayout unchanged labels"""
+        text = str(value)
+        if shown.get(str(text_var)) != text:
+            shown[str(text_var)] = text
+            text_var.set(text)
+
+    def update_stats_frame(stats_snapshot):
+        """Update the changed values in the statistics frame"""
+        cur_pred_stats = stats_snapshot["pred"]
+        cur_prey_stats = stats_snapshot["prey"]
+        cur_general_stats = stats_snapshot["general"]
 
         # update total population
-        tot_pop_text.set(str(cur_prey_stats["population"] + cur_pred_stats["population"]))
+        show(tot_pop_text, cur_prey_stats["population"] + cur_pred_stats["population"])
 
         # update turn number
-        turn_number_text.set(str(cur_general_stats["turn"]))
+        show(turn_number_text, cur_general_stats["turn"])
 
         # update elapsed time
-        elapsed_time_text.set(session_stats.get_time_str())
+        show(elapsed_time_text, stats_snapshot["time"])
+
+        # update throughput
+        show(turn_rate_text, format(stats_snapshot["turns_per_second"], ".1f"))
+        show(turn_time_text, format(stats_snapshot["seconds_per_turn"] * 1000, ".2f"))
 
         # update prey stats
-        prey_pop_text.set(str(cur_prey_stats["population"]))
-        prey_gen_text.set(str(cur_prey_stats["generation"]))
-        prey_births_text.set(str(cur_prey_stats["births"]))
-        prey_deaths_text.set(str(cur_prey_stats["deaths"]))
+        show(prey_pop_text, cur_prey_stats["population"])
+        show(prey_gen_text, cur_prey_stats["generation"])
+        show(prey_births_text, cur_prey_stats["births"])
+        show(prey_deaths_text, cur_prey_stats["deaths"])
 
         # update predator stats
-        pred_pop_text.set(str(cur_pred_stats["population"]))
-        pred_gen_text.set(str(cur_pred_stats["generation"]))
-        pred_births_text.set(str(cur_pred_stats["births"]))
-        pred_deaths_text.set(str(cur_pred_stats["deaths"]))
+        show(pred_pop_text, cur_pred_stats["population"])
+        show(pred_gen_text, cur_pred_stats["generation"])
+        show(pred_births_text, cur_pred_stats["births"])
+        show(pred_deaths_text, cur_pred_stats["deaths"])
+
+        # update profiler timings
+        if settings.general["show_profile"]:
+            # engine timings come with the statistics, drawing timings are measured here
+            summary = dict(stats_snapshot["profile"])
+            view_summary = view_profile.get_summary()
+            for name in ("render", "stats_frame", "chart"):
+                summary[name] = view_summary[name]
+            lines = []
+            for name in profiler.timers:
+                lines.append(name + ": " + format(summary[name]["mean"] * 1000, ".2f"))
+            for name in profiler.counters:
+                lines.append(name + ": " + format(summary[name]["mean"], ".0f"))
+            show(profile_text, "\n".join(lines))
 
     # -----------------------------------------------------------------------------
     # run simulation
     # -----------------------------------------------------------------------------
-    # run simulation indefinitely
-    while True:
-        # exit simulation when stop button pressed
-        if interrupt:
-            break
+    panel = {"snapshot": session_stats,  # statistics shown in the statistics frame
+             "time": 0}  # when they were shown
+
+    def refresh():
+        """Draw the newest frame and statistics published by the engine, then reschedule.
+        Tk never waits on a turn, the engine keeps running in its own process"""
+        if engine.is_stopped():
+            return
+        view_profile.next_turn()
+        stats_snapshot = engine.poll()
+        for error in engine.pop_errors():
+            parameters_window.popup(root, error)
+
+        # draw straight from the shared frame buffer, the engine leaves it alone until released
+        start = view_profile.start()
+        frame = engine.acquire_frame()
+        if frame is not None:
+            sim_renderer.draw(frame)
+            del frame
+            engine.release_frame()
+        view_profile.stop("render", start)
+
+        # refresh the statistics frame at most stats_rate times per second, and only with new statistics
+        now = time.perf_counter()
+        if stats_snapshot is not panel["snapshot"] and now - panel["time"] >= 1 / settings.general["stats_rate"]:
+            start = view_profile.start()
+            update_stats_frame(stats_snapshot)
+            view_profile.stop("stats_frame", start)
+
+            # append the turns finished since to the chart
+            start = view_profile.start()
+            records = engine.pop_series()
+            if population_chart is not None:
+                population_chart.update(records)
+            view_profile.stop("chart", start)
+            panel["snapshot"] = stats_snapshot
+            panel["time"] = now
+
+        root.after(int(1000 // settings.general["frame_rate"]), refresh)
+
+    def close_window():
+        """Stop the engine process before the window closes"""
+        engine.stop()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close_window)
+    refresh()
+
+
+def change_to_replay(root, directory):
+    """Build the simulation screen in replay mode and play back a recorded run.
+    Frames are read straight from the memory-mapped recording, nothing is simulated"""
+    current_row = [0]
+    reader = recorder.TrajectoryReader(directory)
+    replay = {"turn": reader.get_first_turn(),  # turn on screen
+              "position": float(reader.get_first_turn()),  # fractional play position
+              "playing": False,
+              "dirty": True,  # turn changed since last drawn
+              "stopped": False}
 
-        # unless paused, run steps
-        if not pause_simulation:
+    # remove any existing widgets
+    for child in root.winfo_children():
+        child.destroy()
+    root.config(pady=0, width=settings.screen_size*2, menu=tkinter.Menu(root))
+
+    # -----------------------------------------------------------------------------
+    # control buttons frame
+    # -----------------------------------------------------------------------------
+    button_frame = tkinter.Frame(root,
+                                 width=settings.screen_size,
+                                 height=settings.button_height,
+                                 pady=settings.y_pad)
+    button_frame.pack(side="bottom", anchor="sw")
 
-            steps(organisms, session_stats, sim_screen, speed_factors)
-            update_stats_frame(session_stats)
+    # -------------------------------
+    # replay speed slider
+    # -------------------------------
+    speed_slider = tkinter.Scale(button_frame,
+                                 from_=1,
+                                 to=100,
+                                 label="Turns per Frame",
+                                 orient="horizontal",
+                                 length=150,
+                                 width=15)
+    speed_slider.pack(side="left", padx=(10, 20))
+    tktooltip.ToolTip(speed_slider,
+                      msg=settings.tooltip["replay_speed"],
+                      delay=settings.delay_long)
+
+    # -------------------------------
+    # play/pause button
+    # -------------------------------
+    def play():
+        """Toggle playback"""
+        replay["playing"] = not replay["playing"]
+        play_text.set("Pause" if replay["playing"] else "Play")
 
-        # still need to update the screen even if paused
-        # otherwise, program locks up
-        sim_screen.update()
+    play_text = tkinter.StringVar(value="Play")
+    play_button = tkinter.Button(button_frame,
+                                 textvariable=play_text,
+                                 command=play,
+                                 height=settings.button_height,
+                                 width=settings.button_width)
+    play_button.pack(side="left")
+
+    # -------------------------------
+    # seek slider and turn entry
+    # -------------------------------
+    def seek(turn):
+        """Jump to the given turn, clamped to the recorded turns"""
+        turn = min(max(int(float(turn)), reader.get_first_turn()), reader.get_last_turn())
+        if turn != replay["turn"]:
+            replay["turn"] = turn
+            replay["dirty"] = True
+        replay["position"] = float(turn)
+
+    seek_slider = tkinter.Scale(button_frame,
+                                command=seek,
+                                from_=reader.get_first_turn(),
+                                to=max(reader.get_last_turn(), reader.get_first_turn()),
+                                label="Turn",
+                                orient="horizontal",
+                                length=250,
+                                width=15)
+    seek_slider.pack(side="left", padx=(20, 10))
+    tktooltip.ToolTip(seek_slider,
+                      msg=settings.tooltip["replay_seek"],
+                      delay=settings.delay_long)
+
+    def go_to_turn():
+        """Seek to the turn typed in the entry"""
+        try:
+            seek(int(turn_entry.get()))
+        except ValueError:
+            parameters_window.popup(root, "Turn must be an integer.")
+
+    turn_entry = tkinter.Entry(button_frame, width=8)
+    turn_entry.pack(side="left")
+    go_button = tkinter.Button(button_frame,
+                               text="Go",
+                               command=go_to_turn,
+                               height=settings.button_height,
+                               width=settings.button_width // 2)
+    go_button.pack(side="left")
+
+    # -------------------------------
+    # stop button
+    # -------------------------------
+    def quit_replay():
+        """Stop the replay and switch to parameters window"""
+        replay["stopped"] = True
+        parameters_window.change_to_parameters(root,
+                                               settings.prey_attributes,
+                                               settings.pred_attributes)
+
+    stop_button = tkinter.Button(button_frame,
+                                 text="Stop",
+                                 command=quit_replay,
+                                 height=settings.button_height,
+                                 width=settings.button_width)
+    stop_button.pack(side="left", anchor="e", padx=(30, 0))
+
+    # -----------------------------------------------------------------------------
+    # sim screen frame
+    # -----------------------------------------------------------------------------
+    sim_canvas = tkinter.Canvas(root,
+                                width=settings.screen_size,
+                                height=settings.screen_size,
+                                highlightbackground="black",
+                                highlightthickness=1)
+    sim_canvas.pack(side="left", anchor="ne", padx=settings.x_pad//4, pady=settings.y_pad//3)
+    tktooltip.ToolTip(sim_canvas,
+                      msg=settings.tooltip["sim_screen"],
+                      delay=settings.delay_short)
+    sim_renderer = renderer.CanvasRenderer(sim_canvas)
+
+    # -----------------------------------------------------------------------------
+    # replay stats frame
+    # -----------------------------------------------------------------------------
+    side_frame = tkinter.Frame(root,
+                               width=settings.screen_size//2,
+                               highlightbackground="black",
+                               highlightthickness=1)
+    side_frame.pack(side="left", anchor="nw", padx=settings.x_pad//4, pady=settings.y_pad//3)
+
+    title_label = tkinter.Label(side_frame, text="Replay", font='Calibri 12 underline', height=2)
+    title_label.grid(row=plus_one(current_row), column=0, padx=settings.x_pad_right)
+
+    # one label row per value, filled in by draw()
+    replay_texts = {}
+    for name in ("Turn Number:", "Last Turn:", "Total Population:", "Prey:", "Predators:"):
+        name_label = tkinter.Label(side_frame, text=name)
+        name_label.grid(row=plus_one(current_row), column=0, sticky="w")
+        replay_texts[name] = tkinter.StringVar(value="")
+        value_label = tkinter.Label(side_frame, textvariable=replay_texts[name])
+        value_label.grid(row=current_row[0], column=1, sticky="w")
+
+    # blank
+    blank_row_label = tkinter.Label(side_frame, text="")
+    blank_row_label.grid(row=plus_one(current_row), column=1, sticky="w", padx=settings.x_pad_right_super)
+
+    def draw():
+        """Draw the current turn of the recording"""
+        if len(reader) == 0:
+            return
+        frame = reader.frame(replay["turn"])
+        sim_renderer.draw(frame)
+        predators = int(np.count_nonzero(frame.column("identifier") == 1))
+        replay_texts["Turn Number:"].set(str(replay["turn"]))
+        replay_texts["Last Turn:"].set(str(reader.get_last_turn()))
+        replay_texts["Total Population:"].set(str(len(frame)))
+        replay_texts["Prey:"].set(str(len(frame) - predators))
+        replay_texts["Predators:"].set(str(predators))
+        replay["dirty"] = False
+
+    # -----------------------------------------------------------------------------
+    # play back
+    # -----------------------------------------------------------------------------
+    def tick():
+        """Advance playback by the selected speed and draw the turn if it changed, then reschedule"""
+        if replay["stopped"]:
+            return
+        if replay["playing"]:
+            replay["position"] += speed_slider.get()
+            if replay["position"] > reader.get_last_turn():
+                # the run may still be recording, look for new turns before stopping at the end
+                reader.refresh()
+                seek_slider.config(to=max(reader.get_last_turn(), reader.get_first_turn()))
+                if replay["position"] > reader.get_last_turn():
+                    replay["position"] = float(reader.get_last_turn())
+                    play()
+            seek(replay["position"])
+            seek_slider.set(replay["turn"])
+        if replay["dirty"]:
+            draw()
+        root.after(int(1000 // settings.general["frame_rate"]), tick)
+
+    tick()
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+import settings
+
+# upper bound on cells per axis, keeps the cell table small for tiny radii on huge worlds
+max_cells = 1024
+
+
+class SpatialGrid:
+    """Uniform cell-list index over organism positions.
+    Rows are bucketed into square cells at least as wide as the largest query radius,
+    so a radius query only has to look at the cells overlapping the query square
+    instead of every organism in the world."""
+    def __init__(self, world_size=settings.screen_size):
+        self._world_size = world_size
+        self._cells = 1  # cells per axis
+        self._cell_size = world_size
+        self._order = np.zeros(0, dtype=np.intp)  # row indices sorted by cell
+        self._starts = np.zeros(2, dtype=np.intp)  # first position in _order for each cell, plus end
+        self._candidates = 0  # candidate pairs returned by pairs() since the last build
+
+    def get_cell_size(self):
+        return self._cell_size
+
+    def get_candidates(self):
+        return self._candidates
+
+    def build(self, positions, cell_size):
+        """Bucket the given (n, 2) positions into cells of at least cell_size width"""
+        cells = int(self._world_size // max(cell_size, 1.0))
+        self._cells = min(max(cells, 1), max_cells)
+        self._cell_size = self._world_size / self._cells
+
+        cell_ids = self.__cell_ids(positions)
+        self._order = np.argsort(cell_ids, kind="stable")
+        counts = np.bincount(cell_ids, minlength=self._cells * self._cells)
+        self._starts = np.zeros(len(counts) + 1, dtype=np.intp)
+        np.cumsum(counts, out=self._starts[1:])
+        self._candidates = 0
+
+    def pairs(self, positions, rows, radius):
+        """Neighbor candidates of many rows at once. For each row in rows, pairs it with every
+        row in the cells overlapping the square of half-width radius[k] around it.
+        Returns (i, j) candidate index arrays. i follows the order of rows, j is in cell order"""
+        if len(rows) == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        low = self.__cell_coords(positions[rows] - radius[:, None])
+        high = self.__cell_coords(positions[rows] + radius[:, None])
+
+        # one contiguous run of _order per (query row, cell row) combination
+        spans = high[:, 1] - low[:, 1] + 1
+        owner = np.repeat(np.arange(len(rows)), spans)
+        cell_row = np.repeat(low[:, 1], spans) + ragged_arange(spans)
+        first = self._starts[cell_row * self._cells + low[owner, 0]]
+        last = self._starts[cell_row * self._cells + high[owner, 0] + 1]
+
+        # expand every run into its member rows
+        counts = last - first
+        i = np.repeat(np.asarray(rows)[owner], counts)
+        j = self._order[np.repeat(first, counts) + ragged_arange(counts)]
+        self._candidates += len(j)
+        return i, j
+
+    def __cell_coords(self, points):
+        """Return integer [x, y] cell coordinates, clamping points outside the world to edge cells"""
+        coords = np.floor((points + self._world_size / 2) / self._cell_size).astype(np.intp)
+        return np.clip(coords, 0, self._cells - 1)
+
+    def __cell_ids(self, positions):
+        """Return the flat cell id of each position"""
+        coords = self.__cell_coords(positions)
+        return coords[:, 1] * self._cells + coords[:, 0]
+
+
+def ragged_arange(counts):
+    """Return concatenated aranges of the given lengths, e.g. [2, 3] -> [0, 1, 0, 1, 2]"""
+    ends = np.cumsum(counts)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - counts, counts)
+
+
+def cell_size_for(organisms, minimum):
+    """Return a cell size covering the largest vision in the population, never below minimum"""
+    if len(organisms) == 0:
+        return minimum
+    return max(math.ceil(float(organisms.column("vision").max())), minimum)
@@ -1,24 +1,67 @@
 class SpeedControl:
-    """Control the slow_factor and fast_forward variables and
-    their relationships to each other and organism population."""
+    """Control the slow_factor and fast_forward variables and the number of turns per rendered frame.
+    pace() closes the loop on measured wall time: given how long turns and frames really take on this
+    machine, it picks the turns per frame that move organisms across the screen at target_speed,
+    and with adaptive_step also the movement step when even full speed falls short.
+    Measurements are smoothed, so population swings change the pace gradually.
+    Fast-forward never changes a turn, it runs fast_forward times as many exact turns per frame,
+    so a run has the same outcome at any speed."""
+    smoothing = 0.2  # weight of the newest measurement
+    gain = 0.2  # fraction of the remaining slow_factor error corrected per frame
+    min_slow_factor = 1  # largest movement step, one speed unit per turn
+
     def __init__(self, general):
-        self._slow_factor = general["slow_factor"]
+        self._base_slow_factor = general["slow_factor"]  # movement step at normal speed
         self._fast_forward = general["fast_forward"]
+        self._slow_factor = self._base_slow_factor
+        self._target_speed = general.get("target_speed", 0)  # screen units per second per unit of speed
+        self._adaptive_step = general.get("adaptive_step", False)
+        self._frame_time = 1 / general.get("frame_rate", 30)
+        self._turn_seconds = None  # smoothed wall time of one turn
+        self._frame_seconds = None  # smoothed wall time per frame spent outside of turns
+        self._turns_per_frame = 1
+        self._carry = 0  # fraction of a turn carried over to the next frame
 
     def get_slow_factor(self):
         return self._slow_factor
 
     def set_fast_forward(self, value):
-        self._fast_forward = value
+        self._fast_forward = max(int(value), 1)
 
     def get_fast_forward(self):
         return self._fast_forward
 
-    def auto_adjust(self, population):
-        """Adjusts slow_factor based on population parameter.
-        Lower values -> faster movement speeds"""
-        # with slow_factor as y and population as x, best fit line is:
-        # y = 1271.2x^-0.899
-        # additionally adjust by fast-forward factor
-        if population > 0:  # if population is 0, divide by zero error occurs
-            self._slow_factor = (1271.2 * population ** -0.899) / self._fast_forward
+    def get_turns_per_frame(self):
+        return self._turns_per_frame
+
+    def get_turn_seconds(self):
+        """Return the smoothed wall time of one turn, None before the first pace()"""
+        return self._turn_seconds
+
+    def pace(self, turn_seconds, frame_seconds):
+        """Feed back the measured mean wall time of the turns of the last frame and the time the
+        frame spent outside of turns (publishing, drawing, events), and pick the turns per frame"""
+        if self._turn_seconds is None:
+            self._turn_seconds = turn_seconds
+            self._frame_seconds = frame_seconds
+        else:
+            self._turn_seconds += self.smoothing * (turn_seconds - self._turn_seconds)
+            self._frame_seconds += self.smoothing * (frame_seconds - self._frame_seconds)
+
+        # turns that fit in one frame on this machine
+        affordable = max((self._frame_time - self._frame_seconds) / max(self._turn_seconds, 1e-9), 1)
+        # on-screen speed, fast-forward covers that many times the distance per frame
+        speed = self._target_speed * self._fast_forward
+        if self._adaptive_step and speed > 0:
+            # when the machine cannot run that many turns, enlarge the step so fewer turns cover the distance
+            wanted = speed * self._base_slow_factor * self._frame_time
+            step_factor = min(wanted, affordable) / (speed * self._frame_time)
+            step_factor = min(max(step_factor, self.min_slow_factor), self._base_slow_factor)
+            self._slow_factor += self.gain * (step_factor - self._slow_factor)
+
+        # turns per frame covering the target distance with the current step,
+        # fractions are carried over so the mean number of turns per frame is exact
+        wanted = speed * self._slow_factor * self._frame_time
+        turns = max(min(wanted, affordable), 1) + self._carry
+        self._turns_per_frame = int(turns)
+        self._carry = turns - self._turns_per_frame
@@ -1,27 +1,42 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import tempfile
 import time
+import settings
+import lineage
+import time_series
+import trait_stats
 
 
 class Statistics:
-    """Track interesting statistics for the current simulation session."""
-    def __init__(self, predator_attributes, prey_attributes):
+    """Track interesting statistics for the current simulation session.
+    Trait statistics are exact reductions over the population columns, see trait_stats.py.
+    Every turn is recorded in a preallocated ring buffer of settings.general["series_capacity"] turns,
+    optionally spilling older turns to disk, see time_series.py."""
+    def __init__(self, predator_attributes, prey_attributes, seed=None):
         self._pred_init = predator_attributes
         self._prey_init = prey_attributes
-        self._pred_avg = {
-            "population": [],
-            "vision": [0],
-            "speed": [0],
-            "damage": [0],
-            "peripheral": [0]
-        }
-        self._prey_avg = {
-            "population": [],
-            "vision": [0],
-            "speed": [0],
-            "damage": [0],
-            "peripheral": [0]
-        }
+        spill_file = None
+        if settings.general["series_spill"]:
+            # a new file per session, even for sessions of the same seed started in the same second
+            os.makedirs(settings.general["series_directory"], exist_ok=True)
+            descriptor, spill_file = tempfile.mkstemp(suffix=".bin", dir=settings.general["series_directory"],
+                                                      prefix="series_" + time.strftime("%Y%m%d_%H%M%S") + "_" +
+                                                      str(seed) + "_")
+            os.close(descriptor)
+        self._series = time_series.RingBuffer(settings.general["series_capacity"], spill_file=spill_file)
+        self._edges = trait_stats.histogram_edges(predator_attributes, prey_attributes,
+                                                  settings.general["trait_bins"])
+        self._traits = {}  # trait statistics per species, set by measure_traits()
+        self._lineage = lineage.Lineage()
+        # births, deaths and kills of the running turn, the starting population is not counted as births
+        self._turn_counts = {"pred_births": -1 * predator_attributes["population"],
+                             "prey_births": -1 * prey_attributes["population"],
+                             "pred_deaths": 0,
+                             "prey_deaths": 0,
+                             "pred_kills": 0,
+                             "prey_kills": 0}
         self._predator = {"population": 0,
                           "births": -1 * predator_attributes["population"],
                           "deaths": 0,
@@ -45,6 +60,7 @@ class Statistics:
         self._general = {"turn": 0,
                          "gen_length": 100,
                          "elapsed_time": 0.00,
+                         "seed": seed,  # reproduces the run with simulation.Simulation(..., seed=seed)
                          }
         self._start_time = time.time()
 
@@ -78,106 +94,153 @@ class Statistics:
         """Updates the current elapsed time since start_time"""
         self._general["elapsed_time"] = time.time() - self._start_time
 
+    def get_lineage(self):
+        """Return the Lineage of every organism of the session"""
+        return self._lineage
+
+    def get_series(self):
+        """Return the RingBuffer of per-turn records, fields as in time_series.record_dtype"""
+        return self._series
+
     def get_time_str(self):
         """Return elapsed time as a string truncated to two decimal places"""
         self.__stopwatch()
         return "{:.2f}".format(self._general["elapsed_time"])
 
+    def get_state(self):
+        """Return every recorded value but the per-turn series as a dict of plain Python values,
+        see set_state(). The series is saved separately as an array, see get_series()"""
+        return {"pred_init": dict(self._pred_init),
+                "prey_init": dict(self._prey_init),
+                "predator": dict(self._predator),
+                "prey": dict(self._prey),
+                "general": dict(self._general)}
+
+    def set_state(self, state, series=None):
+        """Replace every recorded value with a state returned by get_state(), e.g. from a checkpoint,
+        and the per-turn series with the given records, if any"""
+        self._pred_init = dict(state["pred_init"])
+        self._prey_init = dict(state["prey_init"])
+        self._predator = dict(state["predator"])
+        self._prey = dict(state["prey"])
+        self._general = dict(state["general"])
+        self._edges = trait_stats.histogram_edges(self._pred_init, self._prey_init, settings.general["trait_bins"])
+        self._turn_counts = dict.fromkeys(self._turn_counts, 0)
+        self._series.clear()
+        if series is not None:
+            self._series.extend(time_series.convert(series))
+
     def reset_start_time(self):
         """Resets start time to current time adjusted by elapsed time.
         Use when loading a saved Statistics object!"""
         self._start_time = time.time() - self._general["elapsed_time"]
 
-    def __add_pred_avg(self, keys, data):
-        """Recomputes average attribute values for newly added predator"""
-        for attribute in keys:
-            self._predator[attribute] = (((self._predator["population"] - 1) * self._predator[attribute]) +
-                                         data[attribute]) / self._predator["population"]
-
-    def __add_prey_avg(self, keys, data):
-        """Recomputes average attribute values for newly added prey"""
-        for attribute in keys:
-            self._prey[attribute] = (((self._prey["population"] - 1) * self._prey[attribute]) +
-                                     data[attribute]) / self._prey["population"]
-
-    def __rm_pred_avg(self, keys, data):
-        """Recomputes average attribute values for newly added predator"""
-        if self._predator["population"] > 0:
-            for attribute in keys:
-                self._predator[attribute] = (((self._predator["population"] + 1) * self._predator[attribute]) -
-                                             data[attribute]) / self._predator["population"]
-
-    def __rm_prey_avg(self, keys, data):
-        """Recomputes average attribute values for newly added prey"""
-        if self._prey["population"] > 0:
-            for attribute in keys:
-                self._prey[attribute] = (((self._prey["population"] - 1) * self._prey[attribute]) +
-                                         data[attribute]) / self._prey["population"]
-
-    def add_organism(self, attributes):
-        """Increments the population size of the organism type corresponding to the identifier"""
-        if attributes["identifier"] == 1:
-            self._predator["population"] += 1
-            self._predator["births"] += 1  # increment births too
-            self.__add_pred_avg(["vision", "speed", "damage", "peripheral"], attributes)
-        else:
-            self._prey["population"] += 1
-            self._prey["births"] += 1
-            self.__add_prey_avg(["vision", "speed", "damage", "peripheral"], attributes)
-
-    def remove_organism(self, attributes):
-        """Decrements the population size of the organism type corresponding to the identifier"""
-        if attributes["identifier"] == 1:
-            self._predator["population"] -= 1
-            self._predator["deaths"] += 1  # increment deaths too
-            self.__rm_pred_avg(["vision", "speed", "damage", "peripheral"], attributes)
+    def add_organisms(self, identifier):
+        """Increments the population size of each organism type by its count in the identifier array"""
+        predators = int(np.count_nonzero(identifier == 1))
+        prey = len(identifier) - predators
+        self._predator["population"] += predators
+        self._predator["births"] += predators  # increment births too
+        self._turn_counts["pred_births"] += predators
+        self._prey["population"] += prey
+        self._prey["births"] += prey
+        self._turn_counts["prey_births"] += prey
+
+    def remove_organisms(self, identifier):
+        """Decrements the population size of each organism type by its count in the identifier array"""
+        predators = int(np.count_nonzero(identifier == 1))
+        prey = len(identifier) - predators
+        self._predator["population"] -= predators
+        self._predator["deaths"] += predators  # increment deaths too
+        self._turn_counts["pred_deaths"] += predators
+        self._prey["population"] -= prey
+        self._prey["deaths"] += prey
+        self._turn_counts["prey_deaths"] += prey
+
+    def measure_traits(self, organisms):
+        """Recomputes the trait statistics of both organism types from the population between turns.
+        The averages in the predator and prey stats are their exact means"""
+        self._traits = trait_stats.measure(organisms, self._edges)
+        for stats, name in ((self._predator, "pred"), (self._prey, "prey")):
+            for attribute in trait_stats.traits:
+                stats[attribute] = self._traits[name][attribute]["mean"]
+
+    def get_trait_stats(self):
+        """Returns {"pred"|"prey": {trait: {"count", "mean", "variance", "min", "max", "histogram"}}}
+        as of the last measure_traits()"""
+        return self._traits
+
+    def get_histogram_edges(self):
+        """Returns {trait: bin edges} of the trait histograms"""
+        return self._edges
+
+    def add_kills(self, identifier, count):
+        """Adds count organisms killed in battle by the organism type corresponding to the identifier"""
+        if identifier == 1:
+            self._turn_counts["pred_kills"] += count
         else:
-            self._prey["population"] -= 1
-            self._prey["deaths"] += 1
-            self.__rm_prey_avg(["vision", "speed", "damage", "peripheral"], attributes)
+            self._turn_counts["prey_kills"] += count
 
     def next_turn(self):
-        """Stores data for the current generation"""
+        """Records the turn that just ended in the per-turn series"""
         self._general["turn"] += 1
-        if self._general["turn"] % self._general["gen_length"] == 0:
-            self._pred_avg["population"].append(self._predator["population"])
-            self._prey_avg["population"].append(self._prey["population"])
-            attributes = ["vision", "speed", "damage", "peripheral"]
-            for attribute in attributes:
-                self._pred_avg[attribute].append(self._pred_init[attribute] - self._predator[attribute])
-                self._prey_avg[attribute].append(self._prey_init[attribute] - self._prey[attribute])
+        record = [self._general["turn"]]
+        for prefix, stats in (("pred", self._predator), ("prey", self._prey)):
+            record.append(stats["population"])
+            record.extend(self._turn_counts[prefix + "_" + name] for name in ("births", "deaths", "kills"))
+        for stats in (self._predator, self._prey):
+            record.extend(stats[attribute] for attribute in time_series.trait_fields)
+        self._series.append(tuple(record))
+        self._turn_counts = dict.fromkeys(self._turn_counts, 0)
+
+    def get_time_series(self):
+        """Returns the sampled history as a dict of equal length lists, one entry every gen_length turns.
+        Trait entries are the deviation of the population average from its starting value"""
+        records = self._series.history()
+        records = records[records["turn"] % self._general["gen_length"] == 0]
+        series = {"turn": records["turn"].tolist()}
+        for prefix, init in (("pred", self._pred_init), ("prey", self._prey_init)):
+            series[prefix + "_population"] = records[prefix + "_population"].tolist()
+            for attribute in time_series.trait_fields:
+                series[prefix + "_" + attribute + "_deviation"] = \
+                    (init[attribute] - records[prefix + "_" + attribute]).tolist()
+        return series
 
     def log_population(self):
-        """Generates a graph of population data"""
-        pred_pop = np.array(self._pred_avg["population"])
-        pred_vis = np.array(self._pred_avg["vision"])
-        pred_spd = np.array(self._pred_avg["speed"])
-        pred_dmg = np.array(self._pred_avg["damage"])
-        pred_per = np.array(self._pred_avg["peripheral"])
-
-        prey_pop = np.array(self._prey_avg["population"])
-        prey_vis = np.array(self._prey_avg["vision"])
-        prey_spd = np.array(self._prey_avg["speed"])
-        prey_dmg = np.array(self._prey_avg["damage"])
-        prey_per = np.array(self._prey_avg["peripheral"])
+        """Generates a graph of population data, one point per turn"""
+        records = self._series.history()
+        turn = records["turn"]
+
+        pred_pop = records["pred_population"]
+        pred_vis = self._pred_init["vision"] - records["pred_vision"]
+        pred_spd = self._pred_init["speed"] - records["pred_speed"]
+        pred_dmg = self._pred_init["damage"] - records["pred_damage"]
+        pred_per = self._pred_init["peripheral"] - records["pred_peripheral"]
+
+        prey_pop = records["prey_population"]
+        prey_vis = self._prey_init["vision"] - records["prey_vision"]
+        prey_spd = self._prey_init["speed"] - records["prey_speed"]
+        prey_dmg = self._prey_init["damage"] - records["prey_damage"]
+        prey_per = self._prey_init["peripheral"] - records["prey_peripheral"]
 
         fig, (pop, pred, prey) = plt.subplots(3)
+        fig.suptitle("Seed: " + str(self._general["seed"]))
 
-        pop.plot(pred_pop, color='red', label='Predator')
-        pop.plot(prey_pop, color='green', label='Prey')
+        pop.plot(turn, pred_pop, color='red', label='Predator')
+        pop.plot(turn, prey_pop, color='green', label='Prey')
         pop.set(ylabel="Population Size")
 
-        pred.plot(pred_vis, color='red', linestyle='dashed', label='Vision')
-        pred.plot(pred_spd, color='red', linestyle='solid', label='Speed')
-        pred.plot(pred_dmg, color='red', linestyle='dashdot', label='Damage')
-        pred.plot(pred_per, color='red', linestyle='dotted', label='Peripheral')
+        pred.plot(turn, pred_vis, color='red', linestyle='dashed', label='Vision')
+        pred.plot(turn, pred_spd, color='red', linestyle='solid', label='Speed')
+        pred.plot(turn, pred_dmg, color='red', linestyle='dashdot', label='Damage')
+        pred.plot(turn, pred_per, color='red', linestyle='dotted', label='Peripheral')
         pred.set(ylabel="Deviation")
 
-        prey.plot(prey_vis, color='green', linestyle='dashed', label='Vision')
-        prey.plot(prey_spd, color='green', linestyle='solid', label='Speed')
-        prey.plot(prey_dmg, color='green', linestyle='dashdot', label='Damage')
-        prey.plot(prey_per, color='green', linestyle='dotted', label='Peripheral')
-        prey.set(xlabel="Time (100 turns)", ylabel="Deviation")
+        prey.plot(turn, prey_vis, color='green', linestyle='dashed', label='Vision')
+        prey.plot(turn, prey_spd, color='green', linestyle='solid', label='Speed')
+        prey.plot(turn, prey_dmg, color='green', linestyle='dashdot', label='Damage')
+        prey.plot(turn, prey_per, color='green', linestyle='dotted', label='Peripheral')
+        prey.set(xlabel="Turn", ylabel="Deviation")
 
         pop.legend()
         pred.legend()
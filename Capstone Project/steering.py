@@ -0,0 +1,65 @@
+import numpy as np
+
+
+def visible_pairs(organisms, grid, rows, radius):
+    """Returns (i, j, offset, distance) for every neighbor j within radius[k] and inside the
+    visual field of each row i = rows[k]. offset is position[j] - position[i].
+    rows must be sorted ascending. Pairs are sorted by i, then j, matching the order of the population store"""
+    position = organisms.column("position")
+    direction = organisms.column("direction")
+    peripheral = organisms.column("peripheral")
+
+    i, j = grid.pairs(position, rows, radius)
+    # per pair query radius, looked up through the position of i within rows
+    pair_radius = radius[np.searchsorted(rows, i)]
+
+    offset = position[j] - position[i]
+    distance = np.hypot(offset[:, 0], offset[:, 1])
+    towards = np.arctan2(offset[:, 1], offset[:, 0])
+    in_view = (i != j) & (distance < pair_radius) & \
+              (direction[i] - peripheral[i] < towards) & (towards < direction[i] + peripheral[i])
+
+    # sort the surviving pairs, far fewer than the candidates, by i then j
+    i = i[in_view]
+    j = j[in_view]
+    order = np.argsort(i * len(position) + j)
+    return i[order], j[order], offset[in_view][order], distance[in_view][order]
+
+
+def steer(organisms, i, j, offset, distance):
+    """Returns the resultant (n, 2) movement vector of every organism from its neighbor pairs.
+    Applies the same rules as the per-neighbor behaviors:
+    hunt   - predators move toward neighboring prey
+    flock  - prey move toward neighboring prey keeping separation
+    flee   - prey move away from neighboring predators
+    separate - predators keep minimum distance away from neighboring predators"""
+    identifier = organisms.column("identifier")
+    speed = organisms.column("speed")[i]
+    separation = speed * organisms.column("separation_weight")[i]
+    towards = np.arctan2(offset[:, 1], offset[:, 0])
+
+    self_pred = identifier[i] == 1
+    other_pred = identifier[j] == 1
+    hunt = self_pred & ~other_pred
+    flock = ~self_pred & ~other_pred & (distance > separation)
+    flee = ~self_pred & other_pred
+    separate = self_pred & other_pred & (distance < separation)
+
+    # hunt steers toward the neighbor, flee and separate steer directly away from it
+    heading = np.where(flee | separate, towards + np.pi, towards)
+    x = np.cos(heading) * speed
+    y = np.sin(heading) * speed
+    # flock swaps sine and cosine, kept as-is from the per-neighbor rule
+    x[flock] = np.sin(towards[flock]) * speed[flock]
+    y[flock] = np.cos(towards[flock]) * speed[flock]
+
+    active = hunt | flock | flee | separate
+    x[~active] = 0
+    y[~active] = 0
+
+    # sum every pair's contribution into its owner, in pair order.
+    # Stored into a float array, bincount returns integers when there are no pairs at all
+    vector = np.zeros((len(organisms), 2))
+    vector[:, 0] = np.bincount(i, weights=x, minlength=len(organisms))
+    vector[:, 1] = np.bincount(i, weights=y, minlength=len(organisms))
+    return vector
@@ -0,0 +1,127 @@
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import os
+import numpy as np
+import settings
+import simulation
+
+
+def expand_grid(grid):
+    """Returns one dict per combination of the parameter grid.
+    grid maps parameter names like "prey_birth_rate" or "pred_damage" to lists of values"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def split_params(params):
+    """Returns (prey_attributes, pred_attributes) copies of the defaults in settings with params applied"""
+    prey_attributes = dict(settings.prey_attributes)
+    pred_attributes = dict(settings.pred_attributes)
+    for name, value in params.items():
+        prefix, attribute = name.split("_", 1)
+        if prefix == "prey" and attribute in prey_attributes:
+            prey_attributes[attribute] = value
+        elif prefix == "pred" and attribute in pred_attributes:
+            pred_attributes[attribute] = value
+        else:
+            raise ValueError("Unknown sweep parameter: " + name)
+    return prey_attributes, pred_attributes
+
+
+def run_seed(base_seed, run_index):
+    """Returns the seed of one run, derived from the sweep seed so sweeps are reproducible"""
+    sequence = np.random.SeedSequence(base_seed, spawn_key=(run_index,))
+    return int(sequence.generate_state(1, np.uint64)[0])
+
+
+def run_simulation(job):
+    """Run one headless simulation. Executed in a worker process.
+    Returns the results table rows of the run, one per Statistics sample"""
+    run_index, replicate, params, seed, turns = job
+    prey_attributes, pred_attributes = split_params(params)
+    engine = simulation.Simulation(prey_attributes, pred_attributes, seed=seed)
+    session_stats = engine.get_stats()
+
+    # stop early once both species are extinct, nothing changes after that
+    for turn in range(turns):
+        if session_stats.get_prey_pop() + session_stats.get_pred_stats()["population"] == 0:
+            break
+        engine.step()
+
+    coexist = session_stats.get_prey_pop() > 0 and session_stats.get_pred_stats()["population"] > 0
+    run_info = {"run": run_index,
+                "replicate": replicate,
+                "seed": seed,
+                **params,
+                "final_turn": session_stats.get_general_stats()["turn"],
+                "coexist": coexist}
+    series = session_stats.get_time_series()
+    rows = []
+    for sample in range(len(series["turn"])):
+        row = dict(run_info)
+        for name, values in series.items():
+            row[name] = values[sample]
+        rows.append(row)
+    # runs that ended before the first sample still get a row
+    if not rows:
+        rows.append(run_info)
+    return rows
+
+
+def run_sweep(grid, replicates=1, turns=10000, seed=0, workers=None, output=None):
+    """Run every combination of the parameter grid replicates times on a process pool, one core per worker.
+    Returns the combined results table as a list of row dicts and writes it as CSV to output if given"""
+    jobs = []
+    for params in expand_grid(grid):
+        for replicate in range(replicates):
+            run_index = len(jobs)
+            jobs.append((run_index, replicate, params, run_seed(seed, run_index), turns))
+
+    table = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        # map keeps the results in job order regardless of which run finishes first
+        for rows in pool.map(run_simulation, jobs):
+            table.extend(rows)
+
+    if output is not None:
+        write_csv(table, output)
+    return table
+
+
+def write_csv(table, file_name):
+    """Write the results table to a CSV file, rows missing a column leave it empty"""
+    columns = []
+    for row in table:
+        for name in row:
+            if name not in columns:
+                columns.append(name)
+    with open(file_name, "w", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(table)
+
+
+def parse_param(text):
+    """Parse a "name=v1,v2,..." command line parameter into (name, [values])"""
+    name, values = text.split("=", 1)
+    parsed = []
+    for value in values.split(","):
+        parsed.append(int(value) if value.lstrip("-").isdigit() else float(value))
+    return name, parsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a headless parameter sweep of the A-Life simulation.")
+    parser.add_argument("--param", action="append", default=[], type=parse_param,
+                        help="swept parameter, e.g. prey_birth_rate=0.002,0.005,0.008 (repeatable)")
+    parser.add_argument("--replicates", type=int, default=1, help="runs per parameter combination")
+    parser.add_argument("--turns", type=int, default=10000, help="maximum turns per run")
+    parser.add_argument("--seed", type=int, default=0, help="sweep seed, every run seed derives from it")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, default all cores")
+    parser.add_argument("--output", default="sweep_results.csv", help="CSV results table")
+    args = parser.parse_args()
+
+    results = run_sweep(dict(args.param), args.replicates, args.turns, args.seed, args.workers, args.output)
+    print("Wrote " + str(len(results)) + " rows to " + args.output + ".")
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+import settings
+import population
+import random_streams
+import simulation_steps
+import spatial_grid
+import statistics
+
+
+class RandomStreamsTest(unittest.TestCase):
+    """The fast region seeding must reproduce the SeedSequence streams, or saved seeds stop reproducing runs"""
+    def test_region_states_match_seed_sequence(self):
+        for seed in (0, 1, 2 ** 32 - 1, 2 ** 32, 2 ** 64 - 1, 12345678901234567890, 2 ** 130 + 7):
+            streams = random_streams.RandomStreams(seed, 16)
+            for turn in (0, 1, 4097, 2 ** 32 + 5):
+                for purpose in (random_streams.PLACEMENT, random_streams.WANDER,
+                                random_streams.CONCLUDE, random_streams.BIRTH):
+                    states = streams.region_states(turn, purpose)
+                    for region in range(16):
+                        sequence = np.random.SeedSequence(seed, spawn_key=(turn, purpose, region))
+                        state = np.random.PCG64(sequence).state["state"]
+                        self.assertEqual((state["state"], state["inc"]), states[region])
+
+    def test_random_matches_generator(self):
+        streams = random_streams.RandomStreams(42, 16)
+        self.assertTrue(streams.matches_generator(7, random_streams.WANDER))
+        positions = np.random.default_rng(0).uniform(-400, 400, (500, 2))
+        uids = np.arange(500)
+        draws = streams.random(7, random_streams.WANDER, positions, uids, 3)
+
+        # reference: one SeedSequence generator per region, drawing in ascending uid order
+        expected = np.empty((500, 3))
+        regions = streams.region_of(positions)
+        for region in np.unique(regions):
+            rows = np.flatnonzero(regions == region)
+            rows = rows[np.argsort(uids[rows])]
+            expected[rows] = streams.generator(7, random_streams.WANDER, int(region)).random((len(rows), 3))
+        np.testing.assert_array_equal(draws, expected)
+
+
+class KillCountTest(unittest.TestCase):
+    """A death counts as a battle kill whenever battle damage was taken that turn, even while starving"""
+    def test_starving_predator_killed_in_battle(self):
+        organisms = population.Population()
+        # a prey facing a starving predator right next to it, and a starving predator alone far away
+        identifier = np.array([0, 1, 1])
+        position = np.array([[2.0, 0.0], [0.0, 0.0], [300.0, 0.0]])
+        destination = np.array([[-10.0, 0.0], [10.0, 0.0], [310.0, 0.0]])
+        traits = {"vision": 10.0, "peripheral": np.pi / 4, "speed": 1.0, "damage": np.array([20.0, 0.0, 0.0]),
+                  "separation_weight": 1.0, "birth_rate": 0.0, "mutation_rate": 0.0, "generation": 0,
+                  "lifespan": 100.0, "health": np.array([50.0, 10.0, 1e-9])}
+        organisms.append(identifier, position, destination, traits, np.zeros((3, 4)))
+        self.assertTrue(np.all(organisms.column("energy")[1:] == 0))  # both predators starve
+
+        session_stats = statistics.Statistics(dict(settings.pred_attributes, population=2),
+                                              dict(settings.prey_attributes, population=1), seed=0)
+        session_stats.add_organisms(identifier)
+        grid = spatial_grid.SpatialGrid()
+        grid.build(organisms.column("position"), settings.general["battle_range"])
+        simulation_steps.battle(organisms, grid)
+        simulation_steps.conclude_turn(organisms, session_stats, random_streams.RandomStreams(0))
+        session_stats.next_turn()
+
+        record = session_stats.get_series().get()[-1]
+        self.assertEqual(record["pred_deaths"], 2)  # one killed in battle, one starved
+        self.assertEqual(record["prey_kills"], 1)  # kills by prey: only the predator that took damage
+        self.assertEqual(record["pred_kills"], 0)
+        self.assertEqual(record["prey_deaths"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import numpy as np
+
+# per-turn series recorded by Statistics, one record per turn
+species = ("pred", "prey")
+count_fields = ("population", "births", "deaths", "kills")
+trait_fields = ("vision", "speed", "damage", "peripheral", "lifespan")
+record_dtype = np.dtype([("turn", np.int64)] +
+                        [(prefix + "_" + name, np.int32) for prefix in species for name in count_fields] +
+                        [(prefix + "_" + name, np.float64) for prefix in species for name in trait_fields])
+
+
+def convert(records):
+    """Return records of an older record_dtype as record_dtype, fields it lacked set to 0"""
+    if records.dtype == record_dtype:
+        return records
+    converted = np.zeros(len(records), dtype=record_dtype)
+    for name in record_dtype.names:
+        if name in records.dtype.names:
+            converted[name] = records[name]
+    return converted
+
+
+def read_snapshot(snapshot):
+    """Return every record described by RingBuffer.snapshot(), oldest first, reading spilled records from disk"""
+    spill_file, spilled, records = snapshot
+    if spilled == 0:
+        return records
+    return np.concatenate((np.fromfile(spill_file, dtype=records.dtype, count=spilled), records))
+
+
+class RingBuffer:
+    """Fixed-capacity store of the most recent records, preallocated once so appending is O(1).
+    Once full, each append overwrites the oldest record. With a spill file, every capacity
+    records the full buffer is appended to it before it starts being overwritten, so history()
+    still returns every record ever appended while memory stays bounded."""
+    def __init__(self, capacity, dtype=record_dtype, spill_file=None):
+        self._capacity = max(int(capacity), 1)
+        self._dtype = np.dtype(dtype)
+        self._records = np.zeros(self._capacity, dtype=self._dtype)
+        self._count = 0  # records appended since creation
+        self._spill_file = spill_file
+        self._spilled = 0  # records written to the spill file
+        if spill_file is not None:
+            directory = os.path.dirname(spill_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            open(spill_file, "wb").close()
+
+    def __len__(self):
+        """Return the number of records held in memory"""
+        return min(self._count, self._capacity)
+
+    def get_capacity(self):
+        return self._capacity
+
+    def get_count(self):
+        """Return the number of records appended since creation, including overwritten ones"""
+        return self._count
+
+    def get_spill_file(self):
+        return self._spill_file
+
+    def append(self, record):
+        """Append one record, a tuple in dtype field order"""
+        index = self._count % self._capacity
+        if index == 0 and self._count > self._spilled:
+            self.__spill()
+        self._records[index] = record
+        self._count += 1
+
+    def extend(self, records):
+        """Append every record of a record array, oldest first"""
+        for start in range(0, len(records), self._capacity):
+            chunk = records[start:start + self._capacity]
+            index = self._count % self._capacity
+            if index == 0 and self._count > self._spilled:
+                self.__spill()
+            size = min(len(chunk), self._capacity - index)
+            self._records[index:index + size] = chunk[:size]
+            self._count += size
+            if size < len(chunk):
+                self.__spill()
+                self._records[:len(chunk) - size] = chunk[size:]
+                self._count += len(chunk) - size
+
+    def get(self, name=None, last=None):
+        """Return the records held in memory in order, oldest first, optionally only the named
+        field and the last records. The result is a copy"""
+        size = len(self)
+        if last is not None:
+            size = min(size, last)
+        end = self._count % self._capacity
+        if self._count <= self._capacity:
+            records = self._records[self._count - size:self._count]
+        elif size <= end:
+            records = self._records[end - size:end]
+        else:
+            records = np.concatenate((self._records[self._capacity - (size - end):], self._records[:end]))
+        if name is not None:
+            records = records[name]
+        return records.copy()
+
+    def history(self, name=None):
+        """Return every record ever appended, oldest first, reading spilled records back from disk.
+        Without a spill file only the records still in memory are available"""
+        records = read_snapshot(self.snapshot())
+        if name is not None:
+            records = records[name]
+        return records
+
+    def snapshot(self):
+        """Return (spill_file, spilled, records) describing history() without reading the disk:
+        the spilled records are the first spilled records of the spill file, which only ever grows
+        until clear(), and records is a copy of the newer records held in memory. See read_snapshot()"""
+        if self._spill_file is None or self._spilled == 0:
+            return None, 0, self.get()
+        return self._spill_file, self._spilled, self.get(last=self._count - self._spilled)
+
+    def clear(self):
+        """Drop every record, also truncating the spill file"""
+        self._count = 0
+        self._spilled = 0
+        if self._spill_file is not None:
+            open(self._spill_file, "wb").close()
+
+    def __spill(self):
+        """Append the full buffer, whose records are in order at a wrap, to the spill file"""
+        if self._spill_file is None:
+            self._spilled = self._count
+            return
+        with open(self._spill_file, "ab") as spill:
+            spill.write(self._records[:self._count - self._spilled].tobytes())
+        self._spilled = self._count
@@ -0,0 +1,56 @@
+import numpy as np
+
+# traits summarized per species
+traits = ("vision", "speed", "damage", "peripheral", "lifespan")
+species = ("prey", "pred")  # indexed by identifier
+
+
+def histogram_edges(pred_attributes, prey_attributes, bins):
+    """Return {trait: bin edges} of fixed-width histograms from 0 to twice the larger starting value.
+    Edges only depend on the starting attributes, so histograms of a run stay comparable over time"""
+    edges = {}
+    for trait in traits:
+        high = 2 * max(pred_attributes[trait], prey_attributes[trait])
+        edges[trait] = np.linspace(0, high if high > 0 else 1, bins + 1)
+    return edges
+
+
+def measure(organisms, edges):
+    """Return {"pred"|"prey": {trait: {"count", "mean", "variance", "min", "max", "histogram"}}} over
+    the rows of organisms. Every statistic is an exact reduction over the trait columns: the rows are
+    gathered once, grouped by species, and each statistic is reduced for all traits at once.
+    Values outside the histogram range are counted in its first or last bin.
+    A species without organisms has a mean and variance of 0 and no min/max"""
+    identifier = organisms.column("identifier")
+    order = np.argsort(identifier, kind="stable")
+    counts = np.bincount(identifier, minlength=2)
+    values = np.take(np.stack([organisms.column(trait) for trait in traits]), order, axis=1)
+    segments = (values[:, :counts[0]], values[:, counts[0]:])  # prey rows, then predator rows
+
+    # fixed-width bins of every value, offset so each trait and species gets its own run of bins
+    bins = len(edges[traits[0]]) - 1
+    low = np.array([edges[trait][0] for trait in traits])[:, None]
+    inverse = np.array([1 / (edges[trait][1] - edges[trait][0]) for trait in traits])[:, None]
+    bin_index = np.clip((values - low) * inverse, 0, bins - 1).astype(np.intp)
+    bin_index += (np.arange(len(traits))[:, None] * 2 + identifier[order]) * bins
+    histograms = np.bincount(bin_index.ravel(), minlength=len(traits) * 2 * bins).reshape(len(traits), 2, bins)
+
+    summary = {}
+    for index, name in enumerate(species):
+        segment = segments[index]
+        summary[name] = {}
+        if counts[index]:
+            # two passes, the mean first, so the variance does not lose precision to large means
+            mean = segment.mean(axis=1)
+            variance = ((segment - mean[:, None]) ** 2).mean(axis=1)
+            minimum = segment.min(axis=1)
+            maximum = segment.max(axis=1)
+        for k, trait in enumerate(traits):
+            present = counts[index] > 0
+            summary[name][trait] = {"count": int(counts[index]),
+                                    "mean": float(mean[k]) if present else 0.0,
+                                    "variance": float(variance[k]) if present else 0.0,
+                                    "min": float(minimum[k]) if present else None,
+                                    "max": float(maximum[k]) if present else None,
+                                    "histogram": histograms[k, index]}
+    return summary